@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Compile the question and URL metadata from TOML to the JSON the CLI loads.
+Run it after editing anything in src/the_well_maintained_test/data/*.toml:
+  python compile-data.py
+"""
+
+import json
+from pathlib import Path
+
+import toml
+
+DATA_DIR = Path(__file__).parent / "src" / "the_well_maintained_test" / "data"
+
+
+def compile_data():
+    """Write a .json file next to every .toml file in the data directory."""
+    for source in sorted(DATA_DIR.glob("*.toml")):
+        target = source.with_suffix(".json")
+        target.write_text(json.dumps(toml.loads(source.read_text()), indent=4, ensure_ascii=False) + "\n")
+        print(f"Compiled {source.name} to {target.name}")
+
+
+if __name__ == "__main__":
+    compile_data()
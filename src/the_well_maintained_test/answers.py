@@ -0,0 +1,16 @@
+class Answer(str):
+    """The message answering a question, with the facts behind it in ``data``.
+
+    It is still the message everywhere a string is expected, ``data`` only
+    holds JSON serialisable values for the structured output formats.
+    """
+
+    def __new__(cls, message: str, **data):
+        answer = super().__new__(cls, message)
+        answer.data = data
+        return answer
+
+
+def get_answer_data(answer: str) -> dict:
+    "The facts behind ``answer``, empty for a plain string"
+    return getattr(answer, "data", {})
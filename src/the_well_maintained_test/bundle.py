@@ -0,0 +1,116 @@
+"""Snapshot bundles hold every PyPI and GitHub response a run used, so the
+same packages can be evaluated again without a network connection.
+
+A bundle is a zip file with an ``index.json`` that maps each request to its
+status, headers and the SHA-256 of its body, and a ``blobs/<sha256>`` entry
+for each distinct body. Bodies shared by many requests, like identical test
+files, are only stored once.
+"""
+
+import hashlib
+import io
+import json
+import threading
+import time
+import zipfile
+from pathlib import Path
+
+import requests
+
+BUNDLE_FORMAT = 1
+INDEX_NAME = "index.json"
+# The headers the checks read, the rest only matter to the connection
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Link")
+
+
+def _request_key(method: str, url: str, kwargs: dict) -> str:
+    "How a request is looked up in a bundle: its method, full URL and JSON body, but not its headers"
+    url = requests.Request(method, url, params=kwargs.get("params")).prepare().url
+    body = kwargs.get("json")
+    return f"{method} {url}" if body is None else f"{method} {url} {json.dumps(body, sort_keys=True)}"
+
+
+def _bundle_response(url: str, entry: dict, content: bytes) -> requests.Response:
+    response = requests.Response()
+    response.url = url
+    response.status_code = entry["status"]
+    response.headers.update(entry["headers"])
+    response.encoding = entry.get("encoding")
+    response._content = content
+    # Streamed responses, like repository tarballs, are read from ``raw``
+    response.raw = io.BytesIO(content)
+    return response
+
+
+class BundleWriter:
+    """Collects the responses of a run and saves them as a bundle.
+
+    ``record`` is called for every response the client receives, from any
+    thread, and returns a response that can still be read after its body
+    has been stored.
+    """
+
+    def __init__(self, packages: list = ()):
+        self.packages = list(packages)
+        self._lock = threading.Lock()
+        self._responses = {}
+        self._blobs = {}
+
+    def record(self, method: str, url: str, kwargs: dict, response: requests.Response) -> requests.Response:
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        entry = {
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+            "encoding": response.encoding,
+            "blob": digest,
+        }
+        with self._lock:
+            self._responses[_request_key(method, url, kwargs)] = entry
+            self._blobs[digest] = content
+        return _bundle_response(url, entry, content)
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def save(self, path: Path) -> Path:
+        index = {
+            "format": BUNDLE_FORMAT,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "packages": self.packages,
+            "responses": self._responses,
+        }
+        with self._lock, zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+            bundle.writestr(INDEX_NAME, json.dumps(index, indent=2, sort_keys=True))
+            for digest, content in sorted(self._blobs.items()):
+                bundle.writestr(f"blobs/{digest}", content)
+        return Path(path)
+
+
+class Bundle:
+    """Answers requests from a saved bundle instead of the network.
+
+    A request that wasn't recorded raises ``requests.ConnectionError``, so a
+    package that needs it fails the same way it would without a connection.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._zip = zipfile.ZipFile(self.path)
+        index = json.loads(self._zip.read(INDEX_NAME))
+        if index.get("format") != BUNDLE_FORMAT:
+            raise ValueError(f"{self.path} is not a format {BUNDLE_FORMAT} snapshot bundle")
+        self.packages = index.get("packages", [])
+        self._responses = index.get("responses", {})
+
+    def response(self, method: str, url: str, kwargs: dict) -> requests.Response:
+        entry = self._responses.get(_request_key(method, url, kwargs))
+        if entry is None:
+            raise requests.ConnectionError(f"{url} isn't in the snapshot bundle {self.path.name}")
+        with self._lock:
+            content = self._zip.read(f"blobs/{entry['blob']}")
+        return _bundle_response(url, entry, content)
+
+    def close(self) -> None:
+        self._zip.close()
@@ -0,0 +1,200 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from the_well_maintained_test.answers import Answer, get_answer_data
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# How long an answer is kept for each question. The PyPI questions only
+# change with a new release, the GitHub ones change as the project is worked on.
+QUESTION_TTLS = {
+    "1": None,
+    "2": None,
+    "3": None,
+    "4": DAY,
+    "5": 7 * DAY,
+    "6": None,
+    "7": None,
+    "8": DAY,
+    "9": HOUR,
+    "10": DAY,
+    "11": DAY,
+    "12": DAY,
+}
+
+# The change marker each question's answer depends on. While the marker is
+# the same as when the answer was stored the answer is reused, whatever its
+# TTL (but not past ``max_age``), and as soon as it changes the answer is evaluated again.
+QUESTION_MARKERS = {
+    "5": "tree",
+    "8": "head",
+    "9": "run",
+}
+
+
+class _Database:
+    """SQLite database that is only created the first time it is used.
+
+    A single connection is shared between threads behind a lock.
+    """
+
+    schema = ""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._connection.execute(self.schema)
+        return self._connection
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class HTTPCache(_Database):
+    "Persistent store of responses and the validators (ETag/Last-Modified) that came with them"
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS responses (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            headers TEXT,
+            body BLOB,
+            stored_at REAL
+        )
+    """
+
+    def get(self, url: str) -> tuple:
+        with self._lock:
+            return (
+                self._connect()
+                .execute("SELECT etag, last_modified, headers, body FROM responses WHERE url = ?", (url,))
+                .fetchone()
+            )
+
+    def set(self, url: str, response: requests.Response) -> None:
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    json.dumps(dict(response.headers)),
+                    response.content,
+                    time.time(),
+                ),
+            )
+            connection.commit()
+
+
+class ResultCache(_Database):
+    """Persistent store of the answers for each package release.
+
+    An answer is kept for its question's TTL in ``ttls``, where ``None``
+    keeps it until a new version is released, and never for longer than
+    ``max_age`` seconds when that is set. Answers stored with a change marker
+    (see ``QUESTION_MARKERS``) are instead kept for as long as the marker
+    stays the same, but still no longer than ``max_age``. With ``refresh``
+    nothing is read back, but new answers are still stored. The facts behind
+    an answer (see ``Answer``) are stored with it.
+    """
+
+    # Named for the data column, answers stored before it existed are left behind
+    schema = """
+        CREATE TABLE IF NOT EXISTS answer_data (
+            package TEXT,
+            version TEXT,
+            question TEXT,
+            answer TEXT,
+            data TEXT,
+            marker TEXT,
+            stored_at REAL,
+            PRIMARY KEY (package, version, question)
+        )
+    """
+
+    def __init__(self, path: Path, ttls: dict = None, max_age: float = None, refresh: bool = False):
+        super().__init__(path)
+        self.ttls = QUESTION_TTLS if ttls is None else ttls
+        self.max_age = max_age
+        self.refresh = refresh
+
+    def _ttl(self, question: str) -> float:
+        ttl = self.ttls.get(question)
+        if self.max_age is None:
+            return ttl
+        return self.max_age if ttl is None else min(ttl, self.max_age)
+
+    def get_answers(self, package: str, version: str, markers: dict = None) -> dict:
+        "The answers for a release that haven't expired or whose ``markers`` haven't changed, keyed by question"
+        if self.refresh:
+            return {}
+        markers = markers or {}
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT question, answer, data, marker, stored_at FROM answer_data WHERE package = ? AND version = ?",
+                    (package, version),
+                )
+                .fetchall()
+            )
+        now = time.time()
+        answers = {}
+        for question, answer, data, marker, stored_at in rows:
+            current_marker = markers.get(QUESTION_MARKERS.get(question))
+            ttl = self._ttl(question)
+            if current_marker is not None and marker is not None:
+                if marker == current_marker and (self.max_age is None or now - stored_at <= self.max_age):
+                    answers[question] = Answer(answer, **json.loads(data))
+            elif ttl is None or now - stored_at <= ttl:
+                answers[question] = Answer(answer, **json.loads(data))
+        return answers
+
+    def set(self, package: str, version: str, question: str, answer: str, marker: str = None) -> None:
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO answer_data VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (package, version, question, answer, json.dumps(get_answer_data(answer)), marker, time.time()),
+            )
+            connection.commit()
+
+
+def _conditional_headers(entry: tuple) -> dict:
+    etag, last_modified, _, _ = entry
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def _cached_response(url: str, entry: tuple) -> requests.Response:
+    _, _, headers, body = entry
+    response = requests.Response()
+    response.url = url
+    response.status_code = 200
+    response.headers = CaseInsensitiveDict(json.loads(headers))
+    response._content = body
+    response.from_cache = True
+    return response
@@ -1,52 +1,133 @@
 import json
-from os import system
 from pathlib import Path
-from urllib.parse import urlparse
 
 import click
-import importlib_resources
-import requests
-import toml
-from rich.padding import Padding
 
-from the_well_maintained_test.helpers import (
-    _get_package_github_url,
-    _get_requirements_txt_file,
-)
-
-from . import utils
-from .console import console
-from .helpers import SORRY_MESSAGE
+from .defaults import DEFAULT_CACHE_DIR, DEFAULT_MAX_WAIT, DEFAULT_WORKERS
+from .metadata import _get_questions, _get_urls
 from .styles import (
     answer_link_style,
     answer_padding_style,
     answer_style,
     question_style,
-    special_answer_padding_style,
     warning_style,
 )
-from .utils import (
-    bug_responding,
-    change_log_check,
-    check_tests,
-    ci_passing,
-    ci_setup,
-    commit_in_last_year,
-    documentation_exists,
-    framework_check,
-    get_github_api_rate_limits,
-    get_vulnerabilities,
-    language_check,
-    production_ready_check,
-    release_in_last_year,
-    save_auth,
-    well_used,
-)
+
+# Only the modules every command needs are imported up front. Commands import
+# requests, rich and the checks when they run, so --help and questions start fast.
+
+
+def _print_profile(profile, path: str = None) -> None:  # pragma: no cover
+    "Print how long each stage took and the requests it made, and save them as JSON to ``path``"
+    from rich.console import Console
+    from rich.table import Table
+
+    functions = {question: v.get("question_function") for question, v in _get_questions().get("question").items()}
+    summary = profile.to_dict()
+    table = Table("stage", "seconds", "HTTP calls", "KiB", "cache hits", "rate limit", title="Profile")
+    for stage, totals in [*summary["stages"].items(), ("total", summary["total"])]:
+        if stage == "total":
+            table.add_section()
+        table.add_row(
+            f"{stage} {functions[stage]}" if stage in functions else stage,
+            f"{totals['seconds']:.2f}",
+            str(totals["calls"]),
+            f"{totals['bytes'] / 1024:.0f}",
+            str(totals["cache_hits"]),
+            str(totals["rate_limit"]),
+        )
+    # Standard error keeps the table out of the JSON formats
+    Console(stderr=True).print(table)
+    if path:
+        profile.dump(path)
+
+
+def _configure_client(offline: str = None, use_cache: bool = True, answer_cache: bool = True) -> None:  # pragma: no cover
+    """Set up the caches, rate limit wait and profile from the options given to the group.
+
+    With an ``offline`` bundle every request is answered from it, and the
+    caches are left out so the answers can only come from the bundle.
+    Without ``answer_cache`` only GitHub responses are cached, not answers.
+    """
+    from . import client, profiling
+    from .cache import ResultCache
+    from .evaluate import set_result_cache
+
+    context = click.get_current_context().find_root()
+    options = context.params
+    if offline:
+        from .bundle import Bundle
+
+        client.set_offline(Bundle(offline))
+    elif use_cache and not options["no_cache"]:
+        cache_dir = Path(options["cache_dir"])
+        client.set_cache(cache_dir / "http.sqlite")
+        if answer_cache:
+            set_result_cache(ResultCache(cache_dir / "results.sqlite", max_age=options["max_age"], refresh=options["refresh"]))
+    client.configure(rate_limit_wait=options["rate_limit_wait"])
+    if options["profile"] or options["profile_json"]:
+        run_profile = profiling.Profile()
+        profiling.set_profile(run_profile)
+        context.call_on_close(lambda: _print_profile(run_profile, options["profile_json"]))
+
+
+def _use_tokens(tokens: list) -> None:  # pragma: no cover
+    "Rotate GitHub requests across ``tokens`` when there is more than one"
+    from . import client
+
+    if len(tokens) > 1:
+        client.set_tokens(tokens)
+        client.refresh_token_budgets()
+
+
+def _check_offline(offline: str, graphql: bool) -> None:  # pragma: no cover
+    if offline and graphql:
+        raise click.UsageError("--graphql can't be used with --offline, snapshot bundles only hold REST responses")
 
 
 @click.group()
 @click.version_option()
-def cli():  # pragma: no cover
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, dir_okay=True),
+    default=str(DEFAULT_CACHE_DIR),
+    help="Directory for the GitHub response and answer caches",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Don't use the GitHub response or answer caches",
+)
+@click.option(
+    "--refresh",
+    is_flag=True,
+    help="Evaluate every question again instead of reusing cached answers",
+)
+@click.option(
+    "--max-age",
+    type=click.IntRange(min=0),
+    help="Reuse cached answers at most this many seconds old, on top of each question's own expiry",
+)
+@click.option(
+    "--rate-limit-wait",
+    type=click.IntRange(min=0),
+    default=DEFAULT_MAX_WAIT,
+    show_default=True,
+    help="Longest time in seconds to wait for a used up GitHub rate limit to reset, 0 stops straight away",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Print the time, HTTP calls, bytes, cache hits and rate limit used by each question at the end",
+)
+@click.option(
+    "--profile-json",
+    type=click.Path(file_okay=True, dir_okay=False),
+    help="Also save the profile as JSON to this file, implies --profile",
+)
+def cli(
+    cache_dir: str, no_cache: bool, refresh: bool, max_age: int, rate_limit_wait: int, profile: bool, profile_json: str
+):  # pragma: no cover
     """
     Programatically tries to answer the 12 questions from Adam Johnson's
     blog post https://adamj.eu/tech/2021/11/04/the-well-maintained-test/
@@ -56,7 +137,7 @@ def cli():  # pragma: no cover
         the-well-maintained-test package the-well-maintained-test
 
     """
-    pass
+    # The options are applied by the commands that make requests, see _configure_client
 
 
 @cli.command()
@@ -67,14 +148,21 @@ def cli():  # pragma: no cover
     default="auth.json",
     help="Path to save tokens to, defaults to auth.json",
 )
-def auth(auth: str) -> None:  # pragma: no cover
+@click.option(
+    "--add",
+    is_flag=True,
+    help="Add the token to the ones already saved, requests are spread across all of them",
+)
+def auth(auth: str, add: bool) -> None:  # pragma: no cover
     """Generates a json file with your GitHub Personal Token so that you can have up to
     50,000 API calls instead of 60 for anonymous callers
 
         Args:\n
             auth (str): the name of the file you want to write to for your Personal Token. The default is auth.json
     """
-    save_auth(auth)
+    from .utils import save_auth
+
+    save_auth(auth, add)
 
 
 @cli.command()
@@ -99,29 +187,15 @@ def auth(auth: str) -> None:  # pragma: no cover
 )
 def questions(name: str, question: str, auth_string: str) -> None:  # pragma: no cover
     "List of questions tested"
-    questions_file = importlib_resources.files(__name__) / str(Path("data").joinpath("questions.toml"))
-    with open(Path(questions_file)) as file:
-        questions = toml.load(file)
+    questions = _get_questions()
 
-    "List of URLs to use"
-    urls_file = importlib_resources.files(__name__) / str(Path("data").joinpath("urls.toml"))
-    with open(Path(urls_file)) as file:
-        urls = toml.load(file)
+    if question != "all":
+        import requests
+        from rich.padding import Padding
 
-    try:
-        with open("auth.json") as f:
-            data = json.load(f)
-        headers = {
-            "Authorization": f"token {data['github_personal_token']}",
-        }
-    except FileNotFoundError:
-        headers = {}
-    if auth_string:
-        headers = {
-            "Authorization": f"token {auth_string}",
-        }
+        from .console import console
+        from .helpers import SORRY_MESSAGE
 
-    if question != "all":
         try:
             question_url = questions.get("question").get(question).get("question_url")
             console.print(questions.get("question").get(question).get("question_text"), style=question_style)
@@ -139,26 +213,40 @@ def questions(name: str, question: str, auth_string: str) -> None:  # pragma: no
                     f"[bold green]function_name[/bold green]: {questions.get('question').get(question).get('question_function')}"
                 )
                 console.print(Padding(question_function, answer_padding_style, style=question_style + " italic"))
+                from urllib.parse import urlparse
+
+                from . import client, utils
+                from .helpers import _get_headers, _get_package_github_url, _get_package_snapshot
+
+                _configure_client()
+                headers = _get_headers("auth.json", auth_string)
+                urls = _get_urls()
                 url = urls.get("url").get(question_url).replace("{name}", name)
-                github_url = _get_package_github_url(name)[1]
+                snapshot = _get_package_snapshot(name)
+                github_url = _get_package_github_url(name, snapshot.pypi_data)[1]
                 parse_object = urlparse(github_url)
                 author = parse_object.path.split("/")[-2]
                 if "{author}" in url:
                     url = url.replace("{author}", author)
                 if "{default_branch}" in url:
                     api_url = f"https://api.github.com/repos/{author}/{name}"
-                    default_branch = requests.get(api_url).json().get("default_branch")
+                    default_branch = client.cached_get(api_url, headers=headers).json().get("default_branch")
                     url = url.replace("{default_branch}", default_branch)
 
                 if questions.get("question").get(question).get("headers_needed") == "N":
-                    console.print(getattr(utils, questions.get("question").get(question).get("question_function"))(url))
+                    console.print(
+                        getattr(utils, questions.get("question").get(question).get("question_function"))(snapshot.pypi_data)
+                    )
                 else:
                     console.print(getattr(utils, questions.get("question").get(question).get("question_function"))(url, headers))
         except (AttributeError, TypeError):
             console.print(SORRY_MESSAGE)
+        except requests.RequestException as e:
+            console.print(Padding(str(e), answer_padding_style, style=warning_style))
     else:
+        # Listing the questions is used in shell loops, click prints the same style without loading rich
         for _, v in questions.get("question").items():
-            console.print(v.get("question_text"), style=question_style)
+            click.secho(v.get("question_text"), fg="blue", bold=True)
 
 
 @cli.command()
@@ -166,13 +254,18 @@ def questions(name: str, question: str, auth_string: str) -> None:  # pragma: no
     "-r",
     "--requirements-file",
     type=click.Path(exists=True),
-    help="List of questions that are tested",
+    help="Requirements file, uv.lock, poetry.lock or pyproject.toml to read the packages from",
 )
 @click.option(
     "-o",
     "--output",
     type=click.Choice(["html", "txt"]),
-    help="Show progress on test check",
+    help="Save each package's report to output_<package>.html or .txt",
+)
+@click.option(
+    "--index",
+    is_flag=True,
+    help="With --output, also save an index of every package's report to output-index.html or .txt",
 )
 @click.option(
     "-a",
@@ -181,20 +274,99 @@ def questions(name: str, question: str, auth_string: str) -> None:  # pragma: no
     default="auth.json",
     help="Path to auth tokens, defaults to auth.json",
 )
-def requirements(requirements_file, output, auth):  # pragma: no cover
-    "Loop over a requirements.txt file"
-    packages = _get_requirements_txt_file(requirements_file)
-    for package in packages:
-        console.rule(f"[bold blue] {package[0]}")
-        cmd = f"the-well-maintained-test package '{package[0]}' --auth {auth}"
-        system(cmd)
-        if output == "html":
-            console.save_html(
-                f"output_{package[0].lower()}.html",
-            )
-
-        if output == "txt":
-            console.save_text(f"output_{package[0].lower()}.txt")
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Number of packages to evaluate concurrently",
+)
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=DEFAULT_WORKERS,
+    show_default=True,
+    help="Number of GitHub questions to evaluate, and test files to fetch, concurrently for each package",
+)
+@click.option(
+    "-g",
+    "--graphql",
+    is_flag=True,
+    help="Fetch repository facts with batched GitHub GraphQL queries (requires a token)",
+)
+@click.option(
+    "--archive",
+    is_flag=True,
+    help="Count tests from one download of the repository tarball instead of one API call per test file",
+)
+@click.option(
+    "-f",
+    "--format",
+    "output_format",
+    type=click.Choice(["text", "ndjson"]),
+    default="text",
+    show_default=True,
+    help="Print the reports for people, or one JSON record per line as each package finishes",
+)
+@click.option(
+    "--tree",
+    is_flag=True,
+    help="Also evaluate every package the requirements depend on, each one once, reporting packages as they finish",
+)
+@click.option(
+    "--depth",
+    type=click.IntRange(min=0),
+    help="With --tree, how many levels of dependencies to follow, all of them when not given",
+)
+@click.option(
+    "--offline",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False),
+    help="Answer from a bundle saved by the snapshot command instead of PyPI and GitHub",
+)
+def requirements(
+    requirements_file, output, index, auth, jobs, workers, graphql, archive, output_format, tree, depth, offline
+):  # pragma: no cover
+    "Loop over the packages in a requirements file, lock file or pyproject.toml"
+    from contextlib import nullcontext
+
+    from . import client
+    from .console import console
+    from .evaluate import evaluate_requirements, evaluate_tree
+    from .helpers import _get_headers, _get_tokens
+    from .lockfiles import get_packages
+    from .reports import ReportWriter, print_package
+
+    _check_offline(offline, graphql)
+    _configure_client(offline)
+    headers = _get_headers(auth)
+    if not offline:
+        _use_tokens(_get_tokens(auth))
+    questions = _get_questions()
+    packages = sorted(get_packages(requirements_file))
+    # Each question worker can have another ``workers`` test file requests in flight
+    pool_size = max(client.POOL_SIZES["https://api.github.com"], jobs * workers * 2)
+    client.configure(pool_sizes={"https://api.github.com": pool_size})
+    if tree:
+        reports = evaluate_tree(packages, headers, jobs, workers, graphql, archive, depth)
+    else:
+        # The progress bar would be drawn in the middle of the records
+        text = output_format == "text"
+        reports = evaluate_requirements(packages, headers, jobs, workers, graphql, archive, ordered=text, show_progress=text)
+    if output_format == "ndjson":
+        from .records import report_record
+
+        for report in reports:
+            click.echo(json.dumps(report_record(report)))
+        return
+    # Each report is rendered for its file on its own console while the terminal shows the next one
+    writer = ReportWriter(questions, output, workers=jobs, index=index, width=console.width) if output else nullcontext()
+    with writer:
+        for report in reports:
+            print_package(console, questions, report)
+            if output:
+                writer.write(report)
 
 
 @cli.command()
@@ -225,24 +397,24 @@ def check(resource: str, auth, auth_string):  # pragma: no cover
     Args:\n
         resource (str): Which GitHub resource to check. See Options below.
     """
-    try:
-        with open(auth) as f:
-            data = json.load(f)
-        headers = {
-            "Authorization": f"token {data['github_personal_token']}",
-        }
-    except FileNotFoundError:
-        headers = {}
-    if auth_string:
-        headers = {
-            "Authorization": f"token {auth_string}",
-        }
-    try:
-        message = get_github_api_rate_limits(headers, resource)
-    except AttributeError:
-        message = f"There is an issue with the Token '{auth_string}'"
+    from rich.padding import Padding
+
+    from .console import console
+    from .helpers import _get_tokens
+    from .utils import get_github_api_rate_limits
+
+    _configure_client()
+    tokens = _get_tokens(auth, auth_string) or [None]
+    for token in tokens:
+        headers = {"Authorization": f"token {token}"} if token else {}
+        if len(tokens) > 1:
+            console.rule(f"[bold blue] Token ending in {token[-4:]}")
+        try:
+            message = get_github_api_rate_limits(headers, resource)
+        except AttributeError:
+            message = f"There is an issue with the Token '{token}'"
 
-    console.print(Padding(message, answer_padding_style, style=answer_style))
+        console.print(Padding(message, answer_padding_style, style=answer_style))
 
 
 @cli.command()
@@ -260,6 +432,14 @@ def check(resource: str, auth, auth_string):  # pragma: no cover
     default=True,
     help="Show or hide the progress on Test Checking Question",
 )
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=DEFAULT_WORKERS,
+    show_default=True,
+    help="Number of GitHub questions to evaluate, and test files to fetch, concurrently, 1 does them one after another",
+)
 @click.option(
     "-o",
     "--output",
@@ -279,98 +459,195 @@ def check(resource: str, auth, auth_string):  # pragma: no cover
     type=click.STRING,
     help="GitHub API Token to pass as a string",
 )
-def package(package: str, branch: str, progress: bool, output: str, auth, auth_string) -> None:  # pragma: no cover
+@click.option(
+    "-g",
+    "--graphql",
+    is_flag=True,
+    help="Fetch repository facts with batched GitHub GraphQL queries (requires a token)",
+)
+@click.option(
+    "--archive",
+    is_flag=True,
+    help="Count tests from one download of the repository tarball instead of one API call per test file",
+)
+@click.option(
+    "-f",
+    "--format",
+    "output_format",
+    type=click.Choice(["text", "json"]),
+    default="text",
+    show_default=True,
+    help="Print the report for people, or as one JSON record",
+)
+@click.option(
+    "--offline",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False),
+    help="Answer from a bundle saved by the snapshot command instead of PyPI and GitHub",
+)
+def package(
+    package: str,
+    branch: str,
+    progress: bool,
+    workers: int,
+    output: str,
+    auth,
+    auth_string,
+    graphql: bool,
+    archive: bool,
+    output_format: str,
+    offline: str,
+) -> None:  # pragma: no cover
     """Name of a package on PyPi you'd like to check
 
     Args:\n
         name (str): The name of the Package from PyPi
     """
+    import requests
+    from rich.padding import Padding
+
+    from . import profiling
+    from .console import console, recording
+    from .errors import RateLimitExceeded
+    from .evaluate import _get_package_repo, _get_package_urls, evaluate_package
+    from .graphql import preload_repositories
+    from .helpers import SORRY_MESSAGE, _get_headers, _get_package_snapshot, _get_tokens
+    from .records import package_record
+    from .reports import print_report
+    from .utils import get_vulnerabilities
+
+    _check_offline(offline, graphql)
+    # Cached answers are keyed by release and come from the default branch
+    _configure_client(offline, answer_cache=not branch)
+    headers = _get_headers(auth, auth_string)
+    if not offline:
+        _use_tokens(_get_tokens(auth, auth_string))
     try:
-        with open(auth) as f:
-            data = json.load(f)
-        headers = {
-            "Authorization": f"token {data['github_personal_token']}",
-        }
-    except FileNotFoundError:
-        headers = {}
-    if auth_string:
-        headers = {
-            "Authorization": f"token {auth_string}",
-        }
-    try:
-        pypi_url = f"https://pypi.org/pypi/{package}/json"
-        url = _get_package_github_url(package)[1]
-
-        "url to a github repository you'd like to check"
-        if url[-1] == "/":
-            url = url.strip("/")
-        questions_file = importlib_resources.files(__name__) / str(Path("data").joinpath("questions.toml"))
-        with open(Path(questions_file)) as file:
-            questions = toml.load(file)
-
-        parse_object = urlparse(url)
-        author = parse_object.path.split("/")[-2]
-        package = parse_object.path.split("/")[-1]
-        api_url = f"https://api.github.com/repos/{author}/{package}"
-        if not branch:
-            default_branch = requests.get(api_url).json().get("default_branch")
-        else:
-            default_branch = branch
-        commits_url = f"https://api.github.com/repos/{author}/{package}/commits/{default_branch}"
-        workflows_url = f"https://api.github.com/repos/{author}/{package}/actions/workflows"
-        ci_status_url = f"https://api.github.com/repos/{author}/{package}/actions/runs"
-        bugs_url = f"https://api.github.com/repos/{author}/{package}/issues?labels=bug"
-        tree_url = f"https://api.github.com/repos/{author}/{package}/git/trees/{default_branch}?recursive=1"
-
-        vulnerabilities = get_vulnerabilities(pypi_url)
-        if vulnerabilities > 0:
-            console.rule("[bold red]Vulnerabilities detected!!!")
-            console.print(
-                Padding(f"There are {vulnerabilities} vulnerabilities in this package", answer_padding_style, style=warning_style)
-            )
-            console.rule()
-
-        console.print(questions.get("question").get("1").get("question_text"), style=question_style)
-        console.print(Padding(production_ready_check(pypi_url), answer_padding_style, style=answer_style))
-
-        console.print(questions.get("question").get("2").get("question_text"), style=question_style)
-        console.print(Padding(documentation_exists(pypi_url), answer_padding_style, style=answer_style))
-
-        console.print(questions.get("question").get("3").get("question_text"), style=question_style)
-        console.print(Padding(change_log_check(pypi_url), answer_padding_style, style=answer_style))
-
-        console.print(questions.get("question").get("4").get("question_text"), style=question_style)
-        console.print(Padding(bug_responding(bugs_url, headers), answer_padding_style, style=answer_style))
-
-        console.print(questions.get("question").get("5").get("question_text"), style=question_style)
-        console.print(Padding(check_tests(tree_url, headers, progress), special_answer_padding_style, style=answer_style))
-
-        console.print(questions.get("question").get("6").get("question_text"), style=question_style)
-        console.print(Padding(language_check(pypi_url), answer_padding_style, style=answer_style))
+        with profiling.stage("pypi"):
+            snapshot = _get_package_snapshot(package)
+        if graphql:
+            with profiling.stage("graphql"):
+                preload_repositories([_get_package_repo(snapshot)], headers)
+        with profiling.stage("repository"):
+            urls = _get_package_urls(snapshot, headers, branch)
+        if output_format == "json":
+            answers = dict(evaluate_package(snapshot.pypi_data, urls, headers, False, workers, archive))
+            version = snapshot.pypi_data.get("info").get("version")
+            click.echo(json.dumps(package_record(package, version, get_vulnerabilities(snapshot.pypi_data), answers)))
+            return
+        questions = _get_questions()
+        answers = evaluate_package(snapshot.pypi_data, urls, headers, progress, workers, archive)
+        with recording(output is not None):
+            print_report(console, questions, get_vulnerabilities(snapshot.pypi_data), answers)
+
+            if output == "html":
+                console.save_html("output.html")
+
+            if output == "txt":
+                console.save_text("output.txt")
 
-        console.print(questions.get("question").get("7").get("question_text"), style=question_style)
-        console.print(Padding(framework_check(pypi_url), answer_padding_style, style=answer_style))
-
-        console.print(questions.get("question").get("8").get("question_text"), style=question_style)
-        console.print(Padding(ci_setup(workflows_url, headers), answer_padding_style, style=answer_style))
-
-        console.print(questions.get("question").get("9").get("question_text"), style=question_style)
-        console.print(Padding(ci_passing(ci_status_url, headers), answer_padding_style, style=answer_style))
-
-        console.print(questions.get("question").get("10").get("question_text"), style=question_style)
-        console.print(Padding(well_used(api_url, headers), answer_padding_style, style=answer_style))
-
-        console.print(questions.get("question").get("11").get("question_text"), style=question_style)
-        console.print(Padding(commit_in_last_year(commits_url, headers), answer_padding_style, style=answer_style))
+    except (AttributeError, TypeError):
+        if output_format == "json":
+            click.echo(json.dumps(package_record(package, None, 0, None)))
+        else:
+            console.print(SORRY_MESSAGE)
+    except (RateLimitExceeded, requests.RequestException) as e:
+        # Reported like requirements reports a package it couldn't evaluate
+        if output_format == "json":
+            click.echo(json.dumps(package_record(package, None, 0, None, str(e))))
+        else:
+            console.print(Padding(str(e), answer_padding_style, style=warning_style))
 
-        console.print(questions.get("question").get("12").get("question_text"), style=question_style)
-        console.print(Padding(release_in_last_year(pypi_url), answer_padding_style, style=answer_style))
 
-        if output == "html":
-            console.save_html("output.html")
+@cli.command()
+@click.argument("bundle", type=click.Path(file_okay=True, dir_okay=False))
+@click.argument("packages", nargs=-1)
+@click.option(
+    "-r",
+    "--requirements-file",
+    type=click.Path(exists=True),
+    help="Requirements file, uv.lock, poetry.lock or pyproject.toml to read more packages from",
+)
+@click.option(
+    "-a",
+    "--auth",
+    type=click.Path(file_okay=True, dir_okay=False, allow_dash=False),
+    default="auth.json",
+    help="Path to auth tokens, defaults to auth.json",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Number of packages to record concurrently",
+)
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=DEFAULT_WORKERS,
+    show_default=True,
+    help="Number of GitHub questions to evaluate, and test files to fetch, concurrently for each package",
+)
+@click.option(
+    "--archive",
+    is_flag=True,
+    help="Record the repository tarballs, for replaying with --archive, instead of every test file",
+)
+@click.option(
+    "--tree",
+    is_flag=True,
+    help="Also record every package the packages depend on",
+)
+@click.option(
+    "--depth",
+    type=click.IntRange(min=0),
+    help="With --tree, how many levels of dependencies to follow, all of them when not given",
+)
+def snapshot(bundle, packages, requirements_file, auth, jobs, workers, archive, tree, depth):  # pragma: no cover
+    """Record the PyPI and GitHub responses for packages into a bundle
 
-        if output == "txt":
-            console.save_text("output.txt")
+    The bundle is one compressed file that package and requirements can
+    answer from with --offline, without a network connection:
 
-    except (AttributeError, TypeError):
-        console.print(SORRY_MESSAGE)
+    \b
+        the-well-maintained-test snapshot bundle.zip django
+        the-well-maintained-test package django --offline bundle.zip
+    """
+    from . import client
+    from .bundle import BundleWriter
+    from .console import console
+    from .evaluate import evaluate_requirements, evaluate_tree
+    from .helpers import _get_headers, _get_tokens
+    from .lockfiles import _normalize_name, get_packages
+
+    names = {_normalize_name(package) for package in packages}
+    if requirements_file:
+        names.update(get_packages(requirements_file))
+    if not names:
+        raise click.UsageError("Give the packages to record, or a requirements file with -r")
+    names = sorted(names)
+
+    # Cached responses would be recorded as 304 Not Modified without a body
+    _configure_client(use_cache=False)
+    headers = _get_headers(auth)
+    _use_tokens(_get_tokens(auth))
+    pool_size = max(client.POOL_SIZES["https://api.github.com"], jobs * workers * 2)
+    client.configure(pool_sizes={"https://api.github.com": pool_size})
+    recorder = BundleWriter(names)
+    client.set_recorder(recorder)
+    try:
+        if tree:
+            reports = evaluate_tree(names, headers, jobs, workers, archive=archive, max_depth=depth)
+        else:
+            reports = evaluate_requirements(names, headers, jobs, workers, archive=archive, ordered=False)
+        for report in reports:
+            if report.error:
+                console.print(f"{report.name}: {report.error}", style=warning_style)
+            else:
+                console.print(f"{report.name}: recorded")
+    finally:
+        client.set_recorder(None)
+    recorder.save(bundle)
+    console.print(f"Saved {len(recorder)} responses to {bundle}")
@@ -0,0 +1,231 @@
+import json
+import threading
+from pathlib import Path
+from time import sleep
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from the_well_maintained_test import profiling
+from the_well_maintained_test.cache import HTTPCache, _cached_response, _conditional_headers
+from the_well_maintained_test.ratelimit import RateLimiter
+
+GITHUB_API_URL = "https://api.github.com"
+DEFAULT_TIMEOUT = 30
+DEFAULT_POOL_SIZE = 10
+POOL_SIZES = {
+    "https://api.github.com": 20,
+    "https://pypi.org": 10,
+}
+
+# GitHub answers requests that trip its secondary rate limit with a 403 or
+# 429 and asks clients to wait at least a minute when there's no Retry-After.
+SECONDARY_RATE_LIMIT_RETRIES = 3
+SECONDARY_RATE_LIMIT_BACKOFF = 60
+
+_session = None
+_session_lock = threading.Lock()
+_timeout = DEFAULT_TIMEOUT
+_pool_sizes = dict(POOL_SIZES)
+_cache = None
+_rate_limiter = RateLimiter()
+_tokens = []
+_preloaded = {}
+_preloaded_lock = threading.Lock()
+_recorder = None
+_offline = None
+
+
+def configure(timeout: float = None, pool_sizes: dict = None, rate_limit_wait: float = None) -> None:
+    """Change the default timeout, the per host connection pool sizes and the
+    longest time to wait for the GitHub rate limit to reset.
+
+    The shared session is rebuilt the next time it is needed so that the new
+    pool sizes take effect.
+    """
+    global _session, _timeout
+    with _session_lock:
+        if timeout is not None:
+            _timeout = timeout
+        if rate_limit_wait is not None:
+            _rate_limiter.max_wait = rate_limit_wait
+        if pool_sizes is not None:
+            _pool_sizes.update(pool_sizes)
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def get_session() -> requests.Session:
+    "Return the keep-alive session shared by every check"
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_maxsize=DEFAULT_POOL_SIZE))
+            for prefix, size in _pool_sizes.items():
+                session.mount(prefix, HTTPAdapter(pool_maxsize=size))
+            _session = session
+        return _session
+
+
+def get(url: str, headers: dict = None, **kwargs) -> requests.Response:
+    with _preloaded_lock:
+        document = _preloaded.get(url)
+    if document is not None:
+        profiling.record_cache_hit()
+        return _preloaded_response(url, document)
+    kwargs.setdefault("timeout", _timeout)
+    return _send(get_session().get, url, headers, **kwargs)
+
+
+def _secondary_rate_limit_backoff(response: requests.Response, attempt: int) -> float:
+    "Seconds to wait before retrying ``response``, or ``None`` when it wasn't secondary rate limited"
+    if response.status_code not in (403, 429):
+        return None
+    if response.headers.get("Retry-After"):
+        return float(response.headers.get("Retry-After"))
+    if "secondary rate limit" in response.text.lower():
+        return SECONDARY_RATE_LIMIT_BACKOFF * 2**attempt
+    return None
+
+
+def post(url: str, headers: dict = None, **kwargs) -> requests.Response:
+    kwargs.setdefault("timeout", _timeout)
+    return _send(get_session().post, url, headers, **kwargs)
+
+
+def _send(method, url: str, headers: dict, **kwargs) -> requests.Response:
+    """Make a request over the network, or answer it from the offline bundle.
+
+    Responses are handed to the recorder, when there is one, so a snapshot
+    bundle can be saved at the end of the run.
+    """
+    if _offline is not None:
+        profiling.record_cache_hit()
+        return _offline.response(method.__name__.upper(), url, kwargs)
+    response = _send_request(method, url, headers, **kwargs)
+    if _recorder is not None:
+        response = _recorder.record(method.__name__.upper(), url, kwargs, response)
+    return response
+
+
+def _send_request(method, url: str, headers: dict, **kwargs) -> requests.Response:
+    """Make a request, pacing GitHub API requests to fit the rate limit budget.
+
+    A request GitHub rejects because the budget ran out is made again once
+    the budget resets. One that trips the secondary rate limit is made again
+    up to ``SECONDARY_RATE_LIMIT_RETRIES`` times, after the wait from its
+    Retry-After header, or a wait that doubles from a minute without one.
+    """
+    if not url.startswith(GITHUB_API_URL):
+        response = method(url, headers=headers, **kwargs)
+        profiling.record_response(url, response, kwargs.get("stream", False))
+        return response
+    attempt = 0
+    while True:
+        token = (headers or {}).get("Authorization")
+        if token in _tokens:
+            token = _rate_limiter.best_token(url, _tokens)
+            headers = {**headers, "Authorization": token}
+        _rate_limiter.wait(url, token)
+        response = method(url, headers=headers, **kwargs)
+        profiling.record_response(url, response, kwargs.get("stream", False))
+        _rate_limiter.update(url, response.headers, token)
+        if response.status_code in (403, 429) and _rate_limiter.is_exhausted(url, token):
+            response.close()
+            continue
+        backoff = _secondary_rate_limit_backoff(response, attempt)
+        if backoff is None or attempt == SECONDARY_RATE_LIMIT_RETRIES:
+            return response
+        response.close()
+        attempt += 1
+        sleep(backoff)
+
+
+def set_recorder(recorder=None) -> None:
+    "Hand every response to ``recorder``, a ``BundleWriter``, or stop recording when it is ``None``"
+    global _recorder
+    _recorder = recorder
+
+
+def set_offline(bundle=None) -> None:
+    "Answer every request from ``bundle``, a ``Bundle``, instead of the network, or go back online when it is ``None``"
+    global _offline
+    if _offline is not None:
+        _offline.close()
+    _offline = bundle
+
+
+def set_tokens(tokens: list) -> None:
+    """Spread GitHub requests made with any of ``tokens`` across all of them.
+
+    Each request is sent with whichever token has the most of its rate limit
+    left.
+    """
+    global _tokens
+    _tokens = [f"token {token}" for token in tokens]
+
+
+def refresh_token_budgets() -> None:
+    "Ask GitHub for the rate limit budget of every token, which doesn't count against it"
+    for token in _tokens:
+        # Bypass the rotation in _send, each token has to ask for itself
+        response = get_session().get(f"{GITHUB_API_URL}/rate_limit", headers={"Authorization": token}, timeout=_timeout)
+        resources = response.json().get("resources") or {}
+        for resource, budget in resources.items():
+            _rate_limiter.set_budget(resource, budget.get("remaining"), budget.get("reset"), token, budget.get("limit"))
+
+
+def preload(url: str, document) -> None:
+    "Answer later GET requests for ``url`` with ``document`` instead of calling the API"
+    with _preloaded_lock:
+        _preloaded[url] = document
+
+
+def clear_preloaded(urls: list = None) -> None:
+    "Forget the documents preloaded for ``urls``, or every one of them when it is ``None``"
+    with _preloaded_lock:
+        if urls is None:
+            _preloaded.clear()
+        for url in urls or []:
+            _preloaded.pop(url, None)
+
+
+def _preloaded_response(url: str, document) -> requests.Response:
+    response = requests.Response()
+    response.url = url
+    response.status_code = 200
+    response.headers["Content-Type"] = "application/json"
+    response._content = json.dumps(document).encode()
+    return response
+
+
+def set_cache(path: Path = None) -> None:
+    "Store conditional responses in the SQLite database at ``path``, or stop caching when it is ``None``"
+    global _cache
+    if _cache is not None:
+        _cache.close()
+    _cache = HTTPCache(path) if path is not None else None
+
+
+def cached_get(url: str, headers: dict = None, **kwargs) -> requests.Response:
+    """Make a conditional GET request against the response cache.
+
+    A cached ETag/Last-Modified is sent back as If-None-Match/If-Modified-Since
+    and a ``304 Not Modified`` is answered with the stored body. GitHub doesn't
+    count 304 responses against the rate limit.
+    """
+    if _cache is None:
+        return get(url, headers, **kwargs)
+    entry = _cache.get(url)
+    request_headers = dict(headers or {})
+    if entry is not None:
+        request_headers.update(_conditional_headers(entry))
+    response = get(url, request_headers, **kwargs)
+    if response.status_code == 304 and entry is not None:
+        profiling.record_cache_hit()
+        return _cached_response(url, entry)
+    if response.status_code == 200 and ("ETag" in response.headers or "Last-Modified" in response.headers):
+        _cache.set(url, response)
+    return response
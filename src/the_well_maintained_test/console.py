@@ -1,3 +1,23 @@
+from contextlib import contextmanager
+
 from rich.console import Console
 
-console = Console(record=True)
+# Nothing printed is kept unless it is inside ``recording``, so long runs
+# stream their output instead of holding all of it until the process exits.
+console = Console()
+
+
+@contextmanager
+def recording(enabled: bool = True):
+    """Record what is printed in the block so it can be saved with
+    ``console.save_html`` or ``console.save_text``, and release whatever
+    wasn't saved on the way out. With ``enabled`` false nothing is recorded.
+    """
+    console.record = enabled
+    try:
+        yield console
+    finally:
+        if enabled:
+            # Exporting is the public way to empty the record buffer
+            console.export_text(clear=True)
+        console.record = False
@@ -0,0 +1,12 @@
+"""Defaults shared by the CLI and the modules that use them.
+
+Kept free of third party imports so the CLI can build its options without
+loading ``requests``.
+"""
+
+import os
+from pathlib import Path
+
+DEFAULT_WORKERS = 6
+DEFAULT_MAX_WAIT = 3600
+DEFAULT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "the-well-maintained-test"
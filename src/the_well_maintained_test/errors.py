@@ -0,0 +1,5 @@
+import requests
+
+
+class RateLimitExceeded(requests.RequestException):
+    "The GitHub API budget ran out and won't reset soon enough to wait for it"
@@ -0,0 +1,561 @@
+import asyncio
+import contextvars
+import functools
+import tarfile
+import threading
+import weakref
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from urllib.parse import urlparse
+
+import requests
+
+from the_well_maintained_test import client, profiling
+from the_well_maintained_test.cache import QUESTION_MARKERS
+from the_well_maintained_test.defaults import DEFAULT_WORKERS
+from the_well_maintained_test.graphql import preload_repositories
+from the_well_maintained_test.helpers import (
+    _get_archive_test_files,
+    _get_bug_comment_list,
+    _get_content,
+    _get_package_github_url,
+    _get_package_snapshot,
+    _get_requires_dist,
+    _get_test_files,
+    _test_method_count,
+)
+from the_well_maintained_test.lockfiles import _normalize_name
+from the_well_maintained_test.utils import (
+    _bug_responding_answer,
+    _check_tests_answer,
+    _get_open_bugs,
+    bug_responding,
+    change_log_check,
+    check_tests,
+    ci_passing,
+    ci_setup,
+    commit_in_last_year,
+    documentation_exists,
+    framework_check,
+    get_vulnerabilities,
+    language_check,
+    production_ready_check,
+    release_in_last_year,
+    well_used,
+)
+
+DEFAULT_ASYNC_CONCURRENCY = 20
+
+# Questions answered from the GitHub API. Each one uses its own endpoint, so
+# they can be evaluated at the same time. The remaining questions only read
+# the PyPI document that has already been fetched.
+GITHUB_QUESTIONS = ("4", "5", "8", "9", "10", "11")
+
+# The repository URL each GitHub question is answered from. Packages whose
+# URLs are the same share the answer within a bulk run.
+REPOSITORY_QUESTION_URLS = {
+    "4": "bugs_url",
+    "5": "tree_url",
+    "8": "workflows_url",
+    "9": "ci_status_url",
+    "10": "api_url",
+    "11": "commits_url",
+}
+
+PackageReport = namedtuple("PackageReport", ["name", "vulnerabilities", "answers", "error", "version"], defaults=[None, None])
+
+_result_cache = None
+_async_concurrency = DEFAULT_ASYNC_CONCURRENCY
+_async_executor = None
+_async_executor_lock = threading.Lock()
+_async_semaphores = weakref.WeakKeyDictionary()
+
+
+class RepositoryMemo:
+    """Answers and lookups shared by the packages of a bulk run that come
+    from the same GitHub repository, like the plugins of a monorepo.
+
+    The first package to ask for a key works it out, packages asking for it
+    at the same time wait for that result instead of repeating the requests.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures = {}
+
+    def get(self, key: tuple, function, *args):
+        with self._lock:
+            future = self._futures.get(key)
+            first = future is None
+            if first:
+                future = self._futures[key] = Future()
+        if not first:
+            profiling.record_cache_hit()
+            return future.result()
+        try:
+            result = function(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result
+
+
+def _get_repo_urls(author: str, name: str, default_branch: str) -> dict:
+    repo_url = f"https://api.github.com/repos/{author}/{name}"
+    return {
+        "api_url": repo_url,
+        "commits_url": f"{repo_url}/commits/{default_branch}",
+        "workflows_url": f"{repo_url}/actions/workflows",
+        "ci_status_url": f"{repo_url}/actions/runs",
+        "bugs_url": f"{repo_url}/issues?labels=bug&per_page=100",
+        "tree_url": f"{repo_url}/git/trees/{default_branch}?recursive=1",
+        "tarball_url": f"{repo_url}/tarball/{default_branch}",
+    }
+
+
+def _get_package_repo(snapshot: tuple) -> tuple:
+    url = _get_package_github_url(snapshot.name, snapshot.pypi_data)[1]
+    if url[-1] == "/":
+        url = url.strip("/")
+    parse_object = urlparse(url)
+    author = parse_object.path.split("/")[-2]
+    name = parse_object.path.split("/")[-1]
+    return author, name
+
+
+def _get_default_branch(api_url: str, headers: dict) -> str:
+    return client.cached_get(api_url, headers=headers).json().get("default_branch")
+
+
+def _get_package_urls(snapshot: tuple, headers: dict, branch: str = None, memo: RepositoryMemo = None) -> dict:
+    author, name = _get_package_repo(snapshot)
+    if not branch:
+        api_url = f"https://api.github.com/repos/{author}/{name}"
+        if memo is None:
+            branch = _get_default_branch(api_url, headers)
+        else:
+            # GitHub owner and repository names aren't case sensitive
+            branch = memo.get(("branch", api_url.lower()), _get_default_branch, api_url, headers)
+    return _get_repo_urls(author, name, branch)
+
+
+def _get_question_calls(
+    pypi_data: dict, urls: dict, headers: dict, show_progress: bool, archive: bool = False, workers: int = DEFAULT_WORKERS
+) -> dict:
+    archive_url = urls["tarball_url"] if archive else None
+    return {
+        "1": (production_ready_check, (pypi_data,)),
+        "2": (documentation_exists, (pypi_data,)),
+        "3": (change_log_check, (pypi_data,)),
+        "4": (bug_responding, (urls["bugs_url"], headers, workers)),
+        "5": (check_tests, (urls["tree_url"], headers, show_progress, archive_url, workers)),
+        "6": (language_check, (pypi_data,)),
+        "7": (framework_check, (pypi_data,)),
+        "8": (ci_setup, (urls["workflows_url"], headers)),
+        "9": (ci_passing, (urls["ci_status_url"], headers)),
+        "10": (well_used, (urls["api_url"], headers)),
+        "11": (commit_in_last_year, (urls["commits_url"], headers)),
+        "12": (release_in_last_year, (pypi_data,)),
+    }
+
+
+def evaluate_package(
+    pypi_data: dict,
+    urls: dict,
+    headers: dict,
+    show_progress: bool = True,
+    workers: int = DEFAULT_WORKERS,
+    archive: bool = False,
+    memo: RepositoryMemo = None,
+):
+    """Answer the twelve questions for a package.
+
+    Yields ``(question, message)`` pairs in question order. When ``workers`` is
+    greater than one the GitHub questions are submitted to a bounded thread
+    pool up front, so each answer is yielded as soon as it and every question
+    before it are done. ``workers`` also bounds how many bug timelines question
+    4, and test files question 5, fetch at the same time. With ``archive``
+    question 5 counts the tests from the repository tarball instead of
+    fetching every test file.
+
+    Answers still fresh in the result cache are yielded without being
+    evaluated again, and new answers are stored in it along with the change
+    marker they depend on. With a ``memo`` the GitHub questions, and the
+    markers, are only evaluated once for every package from the same
+    repository.
+    """
+    calls = _get_question_calls(pypi_data, urls, headers, show_progress, archive, workers)
+    release = _get_release(pypi_data) if _result_cache is not None else None
+    markers = {}
+    if release:
+        with profiling.stage("markers"):
+            if memo is None:
+                markers = _get_markers(urls, headers)
+            else:
+                markers = memo.get(("markers", urls.get("commits_url", "").lower()), _get_markers, urls, headers)
+    cached = _result_cache.get_answers(*release, markers) if release else {}
+
+    def answer(question):
+        function, args = calls[question]
+        with profiling.stage(question):
+            if memo is not None and question in REPOSITORY_QUESTION_URLS:
+                message = memo.get((question, urls[REPOSITORY_QUESTION_URLS[question]].lower()), function, *args)
+            else:
+                message = function(*args)
+        if release:
+            _result_cache.set(*release, question, message, markers.get(QUESTION_MARKERS.get(question)))
+        return message
+
+    def cached_answer(question):
+        with profiling.stage(question):
+            profiling.record_cache_hit()
+        return cached[question]
+
+    if workers <= 1:
+        for question in calls:
+            yield question, cached_answer(question) if question in cached else answer(question)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for question in GITHUB_QUESTIONS:
+            if question not in cached:
+                futures[question] = executor.submit(answer, question)
+        for question in calls:
+            if question in cached:
+                yield question, cached_answer(question)
+            elif question in futures:
+                yield question, futures[question].result()
+            else:
+                yield question, answer(question)
+
+
+def set_result_cache(cache) -> None:
+    "Reuse answers stored in ``cache``, a ``ResultCache``, or stop when it is ``None``"
+    global _result_cache
+    if _result_cache is not None:
+        _result_cache.close()
+    _result_cache = cache
+
+
+def _get_markers(urls: dict, headers: dict) -> dict:
+    """Read the cheap markers that show whether a repository changed: the
+    head commit and tree of the default branch, and the latest workflow run
+    with its conclusion.
+
+    These are the same requests questions 9 and 11 make, so they are usually
+    answered by the response cache. Markers that can't be read are left out.
+    """
+    markers = {}
+    try:
+        if urls.get("commits_url"):
+            commit = client.cached_get(urls["commits_url"], headers=headers).json()
+            markers["head"] = commit.get("sha")
+            markers["tree"] = (commit.get("commit") or {}).get("tree", {}).get("sha")
+        if urls.get("ci_status_url"):
+            runs = client.cached_get(urls["ci_status_url"], headers=headers).json().get("workflow_runs") or [{}]
+            # A run keeps its id when it finishes, so the conclusion is part of the marker
+            if runs[0].get("id") is not None:
+                markers["run"] = f"{runs[0].get('id')}:{runs[0].get('conclusion')}"
+    except (requests.RequestException, ValueError, AttributeError):
+        pass
+    return {name: str(marker) for name, marker in markers.items() if marker is not None}
+
+
+def _get_release(pypi_data: dict) -> tuple:
+    info = pypi_data.get("info") or {}
+    if not info.get("name") or not info.get("version"):
+        return None
+    return info.get("name").lower(), info.get("version")
+
+
+def evaluate_report(
+    package: str,
+    headers: dict,
+    show_progress: bool = False,
+    workers: int = DEFAULT_WORKERS,
+    graphql: bool = False,
+    snapshot: tuple = None,
+    archive: bool = False,
+    memo: RepositoryMemo = None,
+) -> tuple:
+    """Fetch a package from PyPI and answer all twelve questions for it.
+
+    ``answers`` is ``None`` when the package can't be evaluated, for example
+    because it doesn't link to a GitHub repository. Network failures are
+    reported in ``error`` so that one package can't stop a bulk run. With
+    ``graphql`` the repository facts are fetched in one GraphQL query first,
+    and forgotten again once the package is done. Bulk runs pass the same
+    ``memo`` for every package, so packages from one repository share its
+    GitHub answers.
+    """
+    preloaded = []
+    try:
+        if snapshot is None:
+            with profiling.stage("pypi"):
+                snapshot = _get_package_snapshot(package)
+        if graphql:
+            with profiling.stage("graphql"):
+                preloaded = preload_repositories([_get_package_repo(snapshot)], headers)
+        with profiling.stage("repository"):
+            urls = _get_package_urls(snapshot, headers, memo=memo)
+        answers = dict(evaluate_package(snapshot.pypi_data, urls, headers, show_progress, workers, archive, memo))
+    except (AttributeError, TypeError):
+        return PackageReport(package, 0, None)
+    except requests.RequestException as e:
+        return PackageReport(package, 0, None, str(e))
+    finally:
+        client.clear_preloaded(preloaded)
+    version = (snapshot.pypi_data.get("info") or {}).get("version")
+    return PackageReport(package, get_vulnerabilities(snapshot.pypi_data), answers, version=version)
+
+
+def _prefetch_repositories(packages: list, headers: dict, jobs: int) -> tuple:
+    """Fetch every package from PyPI, then preload all of their repositories
+    with batched GraphQL queries. Returns the snapshots keyed by package, and
+    the preloaded URLs.
+    """
+
+    def fetch(package):
+        try:
+            snapshot = _get_package_snapshot(package)
+            return snapshot, _get_package_repo(snapshot)
+        except (AttributeError, TypeError, requests.RequestException):
+            return None, None
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor, profiling.stage("pypi"):
+        fetched = dict(zip(packages, executor.map(profiling.in_current_stage(fetch), packages)))
+    with profiling.stage("graphql"):
+        preloaded = preload_repositories([repo for _, repo in fetched.values() if repo], headers)
+    return {package: snapshot for package, (snapshot, _) in fetched.items()}, preloaded
+
+
+def evaluate_requirements(
+    packages: list,
+    headers: dict,
+    jobs: int = 1,
+    workers: int = DEFAULT_WORKERS,
+    graphql: bool = False,
+    archive: bool = False,
+    ordered: bool = True,
+    show_progress: bool = True,
+):
+    """Evaluate many packages in this process, up to ``jobs`` at a time.
+
+    Yields a ``PackageReport`` per package in the order they were given, each
+    one as soon as it and every package before it are done. Without
+    ``ordered`` each report is yielded as soon as its own package is done. The
+    progress bar for question 5 is only shown with ``show_progress``, when
+    packages are evaluated one at a time. Packages from the same GitHub
+    repository share its answers. With ``graphql`` the preloaded repository
+    facts are forgotten once the run is done.
+    """
+    snapshots, preloaded = _prefetch_repositories(packages, headers, jobs) if graphql else ({}, [])
+    memo = RepositoryMemo()
+
+    def evaluate(package):
+        return evaluate_report(
+            package, headers, show_progress and jobs == 1, workers, snapshot=snapshots.get(package), archive=archive, memo=memo
+        )
+
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            if ordered:
+                yield from executor.map(evaluate, packages)
+            else:
+                for future in as_completed([executor.submit(evaluate, package) for package in packages]):
+                    yield future.result()
+    finally:
+        client.clear_preloaded(preloaded)
+
+
+def evaluate_tree(
+    packages: list,
+    headers: dict,
+    jobs: int = 1,
+    workers: int = DEFAULT_WORKERS,
+    graphql: bool = False,
+    archive: bool = False,
+    max_depth: int = None,
+):
+    """Evaluate ``packages`` and everything they depend on, up to ``max_depth``
+    levels of dependencies below them.
+
+    The dependency graph is walked breadth first from the ``requires_dist`` of
+    each PyPI document. Each package is fetched once, however many packages
+    depend on it. Its dependencies are queued as soon as its document
+    arrives, and its evaluation starts straight away, so the levels of the
+    graph overlap instead of running one after another. Reports are yielded
+    as each package finishes, up to ``jobs`` packages being fetched or
+    evaluated at a time. Packages from the same GitHub repository share its
+    answers.
+    """
+
+    def fetch(package):
+        try:
+            snapshot = _get_package_snapshot(package)
+            return snapshot, _get_requires_dist(snapshot.pypi_data), None
+        except (AttributeError, TypeError):
+            return None, [], None
+        except requests.RequestException as e:
+            return None, [], str(e)
+
+    memo = RepositoryMemo()
+    visited = set()
+    fetches = {}
+    evaluations = set()
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+
+        def visit(package, depth):
+            if _normalize_name(package) not in visited:
+                visited.add(_normalize_name(package))
+                fetches[executor.submit(fetch, package)] = (package, depth)
+
+        for package in packages:
+            visit(package, 0)
+        while fetches or evaluations:
+            done, _ = wait([*fetches, *evaluations], return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in evaluations:
+                    evaluations.remove(future)
+                    yield future.result()
+                    continue
+                package, depth = fetches.pop(future)
+                snapshot, requirements, error = future.result()
+                if snapshot is None:
+                    yield PackageReport(package, 0, None, error)
+                    continue
+                if max_depth is None or depth < max_depth:
+                    for requirement in requirements:
+                        visit(requirement, depth + 1)
+                evaluations.add(
+                    executor.submit(evaluate_report, package, headers, False, workers, graphql, snapshot, archive, memo)
+                )
+
+
+def set_async_concurrency(concurrency: int) -> None:
+    "Change how many blocking requests ``evaluate_async`` makes at the same time on each event loop"
+    global _async_concurrency, _async_executor
+    with _async_executor_lock:
+        _async_concurrency = concurrency
+        _async_semaphores.clear()
+        if _async_executor is not None:
+            _async_executor.shutdown(wait=False)
+        _async_executor = None
+
+
+def _get_async_executor() -> ThreadPoolExecutor:
+    global _async_executor
+    with _async_executor_lock:
+        if _async_executor is None:
+            _async_executor = ThreadPoolExecutor(max_workers=_async_concurrency, thread_name_prefix="evaluate-async")
+        return _async_executor
+
+
+def _get_async_semaphore() -> asyncio.Semaphore:
+    # A semaphore can only be awaited from the loop it was first used on
+    loop = asyncio.get_running_loop()
+    with _async_executor_lock:
+        if loop not in _async_semaphores:
+            _async_semaphores[loop] = asyncio.Semaphore(_async_concurrency)
+        return _async_semaphores[loop]
+
+
+async def _run_blocking(function, *args):
+    "Run ``function``, which makes a blocking request, on the async executor once the loop has a free slot for it"
+    async with _get_async_semaphore():
+        call = functools.partial(contextvars.copy_context().run, function, *args)
+        return await asyncio.get_running_loop().run_in_executor(_get_async_executor(), call)
+
+
+async def _bug_responding_async(bugs_url: str, headers: dict) -> str:
+    bugs = await _run_blocking(_get_open_bugs, bugs_url, headers)
+    comment_lists = await asyncio.gather(
+        *(_run_blocking(_get_bug_comment_list, bug.get("timeline_url"), headers) for bug in bugs)
+    )
+    return _bug_responding_answer(bugs, comment_lists)
+
+
+async def _check_tests_async(tree_url: str, headers: dict, archive_url: str = None) -> str:
+    test_list = None
+    if archive_url:
+        try:
+            test_list = await _run_blocking(_get_archive_test_files, archive_url, headers)
+        except (requests.RequestException, tarfile.TarError):
+            pass
+    if test_list is None:
+        test_list = await _run_blocking(_get_test_files, tree_url, headers)
+        contents = await asyncio.gather(*(_run_blocking(_get_content, test.get("url"), headers) for test in test_list))
+        for test, content in zip(test_list, contents):
+            test["test_count"] = _test_method_count(content)
+    return _check_tests_answer(test_list)
+
+
+async def _evaluate_package_async(pypi_data: dict, urls: dict, headers: dict, archive: bool = False) -> dict:
+    """Answer the twelve questions for a package like ``evaluate_package``,
+    with every question, bug timeline and test file fetched concurrently.
+    """
+    calls = _get_question_calls(pypi_data, urls, headers, False, archive)
+    release = _get_release(pypi_data) if _result_cache is not None else None
+    markers = {}
+    if release:
+        with profiling.stage("markers"):
+            markers = await _run_blocking(_get_markers, urls, headers)
+    cached = _result_cache.get_answers(*release, markers) if release else {}
+
+    async def answer(question):
+        function, args = calls[question]
+        with profiling.stage(question):
+            if question in cached:
+                profiling.record_cache_hit()
+                return cached[question]
+            if question == "4":
+                message = await _bug_responding_async(urls["bugs_url"], headers)
+            elif question == "5":
+                message = await _check_tests_async(urls["tree_url"], headers, urls["tarball_url"] if archive else None)
+            elif question in GITHUB_QUESTIONS:
+                message = await _run_blocking(function, *args)
+            else:
+                message = function(*args)
+        if release:
+            _result_cache.set(*release, question, message, markers.get(QUESTION_MARKERS.get(question)))
+        return message
+
+    return dict(zip(calls, await asyncio.gather(*(answer(question) for question in calls))))
+
+
+async def evaluate_async(package: str, headers: dict, graphql: bool = False, archive: bool = False) -> tuple:
+    """Evaluate a package from a coroutine without blocking the event loop.
+
+    Returns the same ``PackageReport`` as ``evaluate_report``. The questions,
+    and the bug timelines and test files behind questions 4 and 5, are
+    awaited concurrently, and only each blocking request is handed to a
+    thread pool kept for them. However many packages are being evaluated, at
+    most ``set_async_concurrency`` requests are made at the same time on an
+    event loop. The loop's default executor, which it also uses for DNS
+    lookups, is left alone.
+    """
+    preloaded = []
+    try:
+        with profiling.stage("pypi"):
+            snapshot = await _run_blocking(_get_package_snapshot, package)
+        if graphql:
+            with profiling.stage("graphql"):
+                preloaded = await _run_blocking(preload_repositories, [_get_package_repo(snapshot)], headers)
+        with profiling.stage("repository"):
+            urls = await _run_blocking(_get_package_urls, snapshot, headers)
+        answers = await _evaluate_package_async(snapshot.pypi_data, urls, headers, archive)
+    except (AttributeError, TypeError):
+        return PackageReport(package, 0, None)
+    except requests.RequestException as e:
+        return PackageReport(package, 0, None, str(e))
+    finally:
+        client.clear_preloaded(preloaded)
+    version = (snapshot.pypi_data.get("info") or {}).get("version")
+    return PackageReport(package, get_vulnerabilities(snapshot.pypi_data), answers, version=version)
+
+
+async def evaluate_requirements_async(packages: list, headers: dict, graphql: bool = False, archive: bool = False) -> list:
+    "Evaluate many packages with ``evaluate_async`` and return their reports in the order they were given"
+    return await asyncio.gather(*(evaluate_async(package, headers, graphql, archive) for package in packages))
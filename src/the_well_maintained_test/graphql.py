@@ -0,0 +1,104 @@
+from the_well_maintained_test import client
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+BATCH_SIZE = 20
+
+REPOSITORY_FIELDS = """
+    defaultBranchRef {
+      name
+      target {
+        ... on Commit {
+          oid
+          authoredDate
+          tree {
+            oid
+          }
+        }
+      }
+    }
+    stargazerCount
+    forkCount
+    watchers {
+      totalCount
+    }
+    openIssues: issues(states: OPEN) {
+      totalCount
+    }
+    openPullRequests: pullRequests(states: OPEN) {
+      totalCount
+    }
+"""
+
+
+def _get_repositories_query(repos: list) -> str:
+    aliases = []
+    for i, (author, name) in enumerate(repos):
+        aliases.append(f"  repo{i}: repository(owner: {_quote(author)}, name: {_quote(name)}) {{{REPOSITORY_FIELDS}  }}")
+    return "query {\n" + "\n".join(aliases) + "\n}"
+
+
+def _quote(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def get_repository_facts(repos: list, headers: dict) -> dict:
+    """Fetch the facts for several repositories with one aliased GraphQL query.
+
+    Returns a dictionary keyed by ``(author, name)``. Repositories that
+    GitHub couldn't resolve are left out.
+    """
+    query = _get_repositories_query(repos)
+    data = client.post(GRAPHQL_URL, headers=headers, json={"query": query}).json().get("data") or {}
+    facts = {}
+    for i, repo in enumerate(repos):
+        if data.get(f"repo{i}"):
+            facts[repo] = data.get(f"repo{i}")
+    return facts
+
+
+def _get_rest_documents(author: str, name: str, facts: dict) -> dict:
+    "Reshape GraphQL repository facts into the REST documents the checks read"
+    repo_url = f"https://api.github.com/repos/{author}/{name}"
+    default_branch = facts.get("defaultBranchRef") or {}
+    documents = {
+        repo_url: {
+            "default_branch": default_branch.get("name"),
+            "watchers": facts.get("stargazerCount"),
+            "network_count": facts.get("forkCount"),
+            "open_issues": facts.get("openIssues").get("totalCount") + facts.get("openPullRequests").get("totalCount"),
+            "subscribers_count": facts.get("watchers").get("totalCount"),
+        },
+    }
+    if default_branch:
+        commit_url = f"{repo_url}/commits/{default_branch.get('name')}"
+        target = default_branch.get("target") or {}
+        # The head commit and tree are the change markers of the result cache
+        documents[commit_url] = {
+            "sha": target.get("oid"),
+            "commit": {"author": {"date": target.get("authoredDate")}, "tree": {"sha": (target.get("tree") or {}).get("oid")}},
+        }
+    return documents
+
+
+def preload_repositories(repos: list, headers: dict, batch_size: int = BATCH_SIZE) -> list:
+    """Answer the default branch, repository stats and last commit requests
+    for ``repos`` from batched GraphQL queries.
+
+    Open bugs aren't preloaded: question 4 pages through all of them and
+    their whole timelines over REST, which one batched query can't do.
+    GitHub's GraphQL API needs a token, so nothing is preloaded without one
+    and the checks fall back to the REST API.
+
+    Returns the preloaded URLs, for the run to clear with
+    ``client.clear_preloaded`` once it is done with them.
+    """
+    if not headers.get("Authorization"):
+        return []
+    repos = list(dict.fromkeys(repos))
+    urls = []
+    for start in range(0, len(repos), batch_size):
+        for (author, name), facts in get_repository_facts(repos[start : start + batch_size], headers).items():
+            for url, document in _get_rest_documents(author, name, facts).items():
+                client.preload(url, document)
+                urls.append(url)
+    return urls
@@ -1,10 +1,15 @@
 import json
 
-try:  # pragma: no cover
-    with open("auth.json") as f:
-        data = json.load(f)
-    headers = {
-        "Authorization": f"token {data['github_personal_token']}",
-    }
-except FileNotFoundError:  # pragma: no cover
-    headers = {}
+
+def __getattr__(name: str):  # pragma: no cover
+    "Read auth.json the first time ``headers`` is used rather than when the module is imported"
+    if name != "headers":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        with open("auth.json") as f:
+            data = json.load(f)
+        return {
+            "Authorization": f"token {data['github_personal_token']}",
+        }
+    except FileNotFoundError:
+        return {}
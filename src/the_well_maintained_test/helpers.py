@@ -1,12 +1,17 @@
+import ast
 import base64
+import io
+import json
 import re
+import tarfile
+import tokenize
 from collections import namedtuple
 from datetime import datetime
 from operator import attrgetter
-from pathlib import Path
 from urllib.parse import urlparse
 
-import requests
+from the_well_maintained_test import client
+from the_well_maintained_test.lockfiles import _requirement_name
 
 SORRY_MESSAGE = """
 This package does not have project_urls defined. You may want to contact them or raise an issue with them to include it.
@@ -17,10 +22,21 @@ https://packaging.python.org/en/latest/guides/distributing-packages-using-setupt
 """
 
 
+def _get_pages(url: str, headers: dict, limit: int = None) -> list:
+    "Follow the ``next`` links of a paginated list endpoint, stopping once ``limit`` items have been read"
+    items = []
+    while url and (limit is None or len(items) < limit):
+        response = client.cached_get(url, headers=headers)
+        response.raise_for_status()
+        items.extend(response.json())
+        url = response.links.get("next", {}).get("url")
+    return items[:limit]
+
+
 def _get_bug_comment_list(url: str, headers: dict) -> list:
     BugComments = namedtuple("BugComments", ["text", "create_date"])
     bug_comment_list = []
-    timeline = requests.get(url, headers=headers).json()
+    timeline = _get_pages(url, headers=headers)
     for t in timeline:
         if t.get("event") == "commented":
             bug_comment = t.get("body")
@@ -30,7 +46,9 @@ def _get_bug_comment_list(url: str, headers: dict) -> list:
 
 
 def _get_content(url: str, headers: dict) -> bytes:
-    response = requests.get(url, headers=headers).json()
+    response = client.get(url, headers=headers)
+    response.raise_for_status()
+    response = response.json()
     if response.get("encoding") != "base64":
         raise TypeError
     else:
@@ -39,21 +57,93 @@ def _get_content(url: str, headers: dict) -> bytes:
 
 
 def _test_method_count(content: bytes) -> int:
-    content_list = str(base64.b64decode(content)).split("\\n")
-    test_methods = [s for s in content_list if "test_" in s]
-    return len(test_methods)
+    return _source_test_method_count(base64.b64decode(content))
+
+
+def _source_test_method_count(source: bytes) -> int:
+    """Count the test functions and methods pytest or unittest would collect
+    from ``source``.
+
+    Files that don't parse, for example Python 2 code, fall back to counting
+    ``def test...`` tokens.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return _token_test_method_count(source)
+    return _body_test_method_count(tree.body)
+
+
+def _body_test_method_count(body: list) -> int:
+    count = 0
+    for node in body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("test"):
+            count += 1
+        elif isinstance(node, ast.ClassDef) and _is_test_class(node):
+            count += _body_test_method_count(node.body)
+    return count
+
+
+def _is_test_class(node: ast.ClassDef) -> bool:
+    if node.name.startswith("Test"):
+        return True
+    for base in node.bases:
+        name = base.attr if isinstance(base, ast.Attribute) else getattr(base, "id", "")
+        if name.endswith("TestCase"):
+            return True
+    return False
+
+
+def _token_test_method_count(source: bytes) -> int:
+    count = 0
+    previous = None
+    try:
+        for token in tokenize.tokenize(io.BytesIO(source).readline):
+            if token.type == tokenize.NAME:
+                if previous == "def" and token.string.startswith("test"):
+                    count += 1
+                previous = token.string
+    except (tokenize.TokenError, SyntaxError):
+        pass
+    return count
+
+
+def _is_test_file(path: str) -> bool:
+    return bool(re.search(r"test(s|_(.*)).py", path))
 
 
 def _get_test_files(url: str, headers: dict) -> list:
     test_file_list = []
-    r = requests.get(url, headers=headers).json()
-    for i in r.get("tree"):
-        if i.get("type") == "blob" and re.search(r"test(s|_(.*)).py", i.get("path")):
+    response = client.cached_get(url, headers=headers)
+    response.raise_for_status()
+    for i in response.json().get("tree"):
+        if i.get("type") == "blob" and _is_test_file(i.get("path")):
             test_file_list.append(i)
 
     return test_file_list
 
 
+def _get_archive_test_files(url: str, headers: dict) -> list:
+    """Stream the repository tarball at ``url`` and count the tests in every
+    test file as it goes past, without writing anything to disk.
+
+    Returns the test files like ``_get_test_files`` does, with a
+    ``test_count`` for each one.
+    """
+    test_file_list = []
+    response = client.get(url, headers=headers, stream=True)
+    response.raise_for_status()
+    response.raw.decode_content = True
+    with response, tarfile.open(fileobj=response.raw, mode="r|gz") as archive:
+        for member in archive:
+            # Members are stored under a single "{author}-{name}-{sha}/" directory
+            path = member.name.partition("/")[2]
+            if member.isfile() and _is_test_file(path):
+                source = archive.extractfile(member).read()
+                test_file_list.append({"path": path, "test_count": _source_test_method_count(source)})
+    return test_file_list
+
+
 def _get_release_date(release: dict) -> list:
     Release = namedtuple("Release", "version, upload_time")
     releases = []
@@ -67,20 +157,36 @@ def _get_release_date(release: dict) -> list:
     return releases
 
 
-def _get_requirements_txt_file(requirements_file: Path) -> list:
-    with open(requirements_file) as f:
-        requirements = f.readlines()
-    packages = [s.replace("\n", "").replace("==", " ").split(" ")[0] for s in requirements]
-    package_urls = []
-    for package in packages:
-        data = _get_package_github_url(package)
-        package_urls.append(data)
-    return sorted(package_urls, key=lambda x: x[0].lower())
+def _get_requires_dist(pypi_data: dict) -> list:
+    """The names of the packages a release depends on, from ``requires_dist``.
 
+    Dependencies that are only installed with one of the package's extras are
+    left out. Other environment markers are not evaluated, so a dependency
+    for any Python version or platform is included.
+    """
+    requirements = []
+    for requirement in (pypi_data.get("info") or {}).get("requires_dist") or []:
+        specifier, _, marker = requirement.partition(";")
+        if re.search(r"\bextra\s*==", marker):
+            continue
+        name = _requirement_name(specifier)
+        if name and name not in requirements:
+            requirements.append(name)
+    return requirements
 
-def _get_package_github_url(package: str) -> tuple:
+
+def _get_package_snapshot(package: str) -> tuple:
+    PackageSnapshot = namedtuple("PackageSnapshot", ["name", "version", "pypi_data"])
     url = f"https://pypi.org/pypi/{package}/json"
-    project_urls = requests.get(url).json().get("info").get("project_urls")
+    pypi_data = client.get(url).json()
+    return PackageSnapshot(package, pypi_data.get("info").get("version"), pypi_data)
+
+
+def _get_package_github_url(package: str, pypi_data: dict = None) -> tuple:
+    if pypi_data is None:
+        pypi_data = _get_package_snapshot(package).pypi_data
+    project_urls = pypi_data.get("info").get("project_urls")
+    value = (package, None)
     for k, v in project_urls.items():
         if urlparse(v).netloc == "github.com" and len(urlparse(v).path.split("/")) == 3:
             value = (package, v)
@@ -89,3 +195,29 @@ def _get_package_github_url(package: str) -> tuple:
             a = urlparse(v).path.split("/")[2]
             value = (package, f"https://www.github.com/{p}/{a}")
     return value
+
+
+def _get_headers(auth: str, auth_string: str = None) -> dict:
+    tokens = _get_tokens(auth, auth_string)
+    if not tokens:
+        return {}
+    return {"Authorization": f"token {tokens[0]}"}
+
+
+def _get_tokens(auth: str, auth_string: str = None) -> list:
+    if auth_string:
+        return [auth_string]
+    try:
+        with open(auth) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return []
+    return _get_auth_tokens(data)
+
+
+def _get_auth_tokens(auth_data: dict) -> list:
+    "Every token in an auth.json file, ``github_personal_token`` first"
+    tokens = auth_data.get("github_personal_tokens", [])
+    if auth_data.get("github_personal_token"):
+        tokens = [auth_data.get("github_personal_token")] + tokens
+    return list(dict.fromkeys(tokens))
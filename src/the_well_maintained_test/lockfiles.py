@@ -0,0 +1,112 @@
+import re
+from pathlib import Path
+
+try:
+    import tomllib
+except ImportError:  # pragma: no cover
+    # Python 3.10, toml has the same loads()
+    import toml as tomllib
+
+# Lock files read as TOML, other *.lock files like Rye's requirements.lock are
+# pip requirements files
+TOML_LOCKFILES = ("uv.lock", "poetry.lock")
+# Sources of packages in uv.lock and poetry.lock that aren't on PyPI
+LOCAL_SOURCES = ("editable", "virtual", "directory", "path", "file")
+
+
+def _normalize_name(package: str) -> str:
+    "The PEP 503 normalized form of a package name, so Foo_Bar and foo-bar are the same package"
+    return re.sub(r"[-_.]+", "-", package).lower()
+
+
+def _requirement_name(requirement: str) -> str:
+    "The package name a PEP 508 requirement starts with, ``None`` when it doesn't start with one"
+    name = re.match(r"\s*([A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)\s*(?:$|[\[(;<>=!~@\s])", requirement)
+    return name.group(1) if name else None
+
+
+def _unique(names) -> list:
+    "``names`` without duplicates under PEP 503 normalization, in the spelling they first appear in"
+    unique = {}
+    for name in names:
+        if name:
+            unique.setdefault(_normalize_name(name), name)
+    return list(unique.values())
+
+
+def _requirements_txt_lines(requirements_file: Path, seen: set) -> list:
+    """The requirement lines of a pip requirements file, without comments,
+    options or hashes, and with line continuations joined. Files included
+    with ``-r`` are read in their place, each one once.
+    """
+    requirements_file = Path(requirements_file)
+    seen.add(requirements_file.resolve())
+    lines = []
+    for line in re.sub(r"\\\r?\n", " ", requirements_file.read_text()).splitlines():
+        line = re.sub(r"(^|\s)#.*", "", line).strip()
+        include = re.match(r"(?:-r|--requirement)(?:\s+|=)(\S+)", line)
+        if include:
+            included = requirements_file.parent / include.group(1)
+            if included.resolve() not in seen:
+                lines += _requirements_txt_lines(included, seen)
+        elif line and not line.startswith("-"):
+            lines.append(line)
+    return lines
+
+
+def _get_requirements_txt_packages(requirements_file: Path) -> list:
+    """The packages in a pip requirements file, including pip-compile output.
+
+    Extras, version specifiers, environment markers, ``--hash`` options,
+    comments and constraints files are ignored. Lines that don't start with
+    a package name, like URLs and local paths, are skipped.
+    """
+    return _unique(_requirement_name(line) for line in _requirements_txt_lines(requirements_file, set()))
+
+
+def _get_lockfile_packages(lockfile: Path) -> list:
+    "The packages locked in a uv.lock or poetry.lock, leaving out the project itself and local packages"
+    data = tomllib.loads(Path(lockfile).read_text())
+    names = []
+    for package in data.get("package", []):
+        source = package.get("source") or {}
+        if any(key in source for key in LOCAL_SOURCES) or source.get("type") in LOCAL_SOURCES:
+            continue
+        names.append(package.get("name"))
+    return _unique(names)
+
+
+def _get_pyproject_packages(pyproject: Path) -> list:
+    """The dependencies declared in a pyproject.toml: the project's
+    dependencies and optional dependencies, its dependency groups, and
+    Poetry's dependency tables.
+    """
+    data = tomllib.loads(Path(pyproject).read_text())
+    project = data.get("project", {})
+    requirements = list(project.get("dependencies", []))
+    for group in [*project.get("optional-dependencies", {}).values(), *data.get("dependency-groups", {}).values()]:
+        # Dependency groups can include other groups with a table, those are listed anyway
+        requirements += [requirement for requirement in group if isinstance(requirement, str)]
+    names = [_requirement_name(requirement) for requirement in requirements]
+    poetry = data.get("tool", {}).get("poetry", {})
+    tables = [poetry.get("dependencies", {}), poetry.get("dev-dependencies", {})]
+    tables += [group.get("dependencies", {}) for group in poetry.get("group", {}).values()]
+    names += [name for table in tables for name in table if name.lower() != "python"]
+    return _unique(names)
+
+
+def get_packages(path: Path) -> list:
+    """The PEP 503 normalized names of the packages in a requirements file,
+    uv.lock, poetry.lock or pyproject.toml, each one once.
+
+    The format is chosen by the file name, anything that isn't a uv.lock,
+    poetry.lock or pyproject.toml is read as a pip requirements file.
+    """
+    path = Path(path)
+    if path.name == "pyproject.toml":
+        packages = _get_pyproject_packages(path)
+    elif path.name in TOML_LOCKFILES:
+        packages = _get_lockfile_packages(path)
+    else:
+        packages = _get_requirements_txt_packages(path)
+    return [_normalize_name(package) for package in packages]
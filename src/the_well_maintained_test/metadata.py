@@ -0,0 +1,17 @@
+import json
+import pkgutil
+
+# The question and URL metadata is edited in data/*.toml and compiled to JSON
+# with compile-data.py, which loads much faster than parsing the TOML.
+
+
+def _load(name: str) -> dict:
+    return json.loads(pkgutil.get_data("the_well_maintained_test", f"data/{name}.json"))
+
+
+def _get_questions() -> dict:
+    return _load("questions")
+
+
+def _get_urls() -> dict:
+    return _load("urls")
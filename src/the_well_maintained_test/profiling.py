@@ -0,0 +1,119 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+
+import requests
+
+GITHUB_API_URL = "https://api.github.com"
+OTHER_STAGE = "other"
+FIELDS = ("seconds", "calls", "bytes", "cache_hits", "rate_limit")
+
+_profile = None
+_stage = ContextVar("stage", default=OTHER_STAGE)
+
+
+class Profile:
+    """Wall time, HTTP calls, bytes downloaded, cache hits and GitHub rate
+    limit budget used by each stage of a run.
+
+    A stage is a question number, or one of the steps around the questions
+    such as fetching the PyPI document. Stages of different packages with the
+    same name are added up, and requests made outside any stage are counted
+    under ``other``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._started = time.perf_counter()
+
+    def add(self, stage: str, **counts) -> None:
+        with self._lock:
+            totals = self._stages.setdefault(stage, dict.fromkeys(FIELDS, 0))
+            for field, count in counts.items():
+                totals[field] += count
+
+    def stages(self) -> dict:
+        "The totals of every stage, in the order they first started"
+        with self._lock:
+            return {stage: dict(totals) for stage, totals in self._stages.items()}
+
+    def to_dict(self) -> dict:
+        stages = self.stages()
+        totals = {field: sum(stage[field] for stage in stages.values()) for field in FIELDS}
+        # Stages overlap when questions are evaluated concurrently, so the
+        # run took less than the sum of their times
+        totals["seconds"] = time.perf_counter() - self._started
+        return {"stages": stages, "total": totals}
+
+    def dump(self, path: Path) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2))
+
+
+def set_profile(profile: Profile = None) -> None:
+    "Record every request in ``profile``, or stop recording when it is ``None``"
+    global _profile
+    _profile = profile
+
+
+def get_profile() -> Profile:
+    return _profile
+
+
+@contextmanager
+def stage(name: str):
+    "Count the time spent, and the requests made, in the block towards the stage ``name``"
+    if _profile is None:
+        yield
+        return
+    _profile.add(name)
+    token = _stage.set(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _profile.add(name, seconds=time.perf_counter() - start)
+        _stage.reset(token)
+
+
+def in_current_stage(function):
+    """Wrap ``function`` so the requests it makes from a worker thread count
+    towards the stage it was wrapped in, threads don't inherit it."""
+    name = _stage.get()
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        token = _stage.set(name)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _stage.reset(token)
+
+    return wrapper
+
+
+def record_response(url: str, response: requests.Response, stream: bool = False) -> None:
+    """Count a request sent over the network.
+
+    GitHub doesn't count ``304 Not Modified`` responses against the rate
+    limit. The body of a streamed response hasn't been read yet, so its
+    Content-Length is counted instead.
+    """
+    if _profile is None:
+        return
+    if stream:
+        size = int(response.headers.get("Content-Length") or 0)
+    else:
+        size = len(response.content or b"")
+    used = int(url.startswith(GITHUB_API_URL) and response.status_code != 304)
+    _profile.add(_stage.get(), calls=1, bytes=size, rate_limit=used)
+
+
+def record_cache_hit() -> None:
+    "Count a request or answer served from one of the caches"
+    if _profile is not None:
+        _profile.add(_stage.get(), cache_hits=1)
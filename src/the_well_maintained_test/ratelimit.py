@@ -0,0 +1,89 @@
+import threading
+import time
+from time import sleep
+
+from the_well_maintained_test.defaults import DEFAULT_MAX_WAIT
+from the_well_maintained_test.errors import RateLimitExceeded
+
+# Below this fraction of the X-RateLimit-Limit left the limiter starts
+# spreading the rest of the budget evenly over the time left until it resets.
+# For a 5,000 an hour token that's the last 100 requests, while the 60 an hour
+# anonymous budget is too small to pace at all.
+DEFAULT_RESERVE = 0.02
+
+
+def _get_resource(url: str) -> str:
+    return "graphql" if url.endswith("/graphql") else "core"
+
+
+class RateLimiter:
+    """Paces GitHub requests to fit the budget reported by the
+    ``X-RateLimit-Remaining`` and ``X-RateLimit-Reset`` headers.
+
+    Every GitHub response updates the budget for its token and resource, and
+    every request takes one request out of it, so threads sharing a limiter
+    also share the budget. Paced requests are handed one slot each, so
+    threads wait their turn instead of all waking up together. When the
+    budget runs out the limiter sleeps until it
+    resets, or raises ``RateLimitExceeded`` when that is more than
+    ``max_wait`` seconds away.
+    """
+
+    def __init__(self, reserve: float = DEFAULT_RESERVE, max_wait: float = DEFAULT_MAX_WAIT):
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._budgets = {}
+
+    def set_budget(self, resource: str, remaining: int, reset: int, token: str = None, limit: int = None) -> None:
+        with self._lock:
+            budget = self._budgets.get((token, resource)) or {"next_slot": 0}
+            self._budgets[(token, resource)] = {**budget, "remaining": remaining, "reset": reset, "limit": limit}
+
+    def update(self, url: str, headers: dict, token: str = None) -> None:
+        if headers.get("X-RateLimit-Remaining") is None or headers.get("X-RateLimit-Reset") is None:
+            return
+        resource = headers.get("X-RateLimit-Resource") or _get_resource(url)
+        limit = int(headers.get("X-RateLimit-Limit")) if headers.get("X-RateLimit-Limit") else None
+        self.set_budget(resource, int(headers.get("X-RateLimit-Remaining")), int(headers.get("X-RateLimit-Reset")), token, limit)
+
+    def remaining(self, url: str, token: str = None) -> float:
+        "Requests left for ``token`` on the resource ``url`` uses, infinite while that isn't known"
+        with self._lock:
+            budget = self._budgets.get((token, _get_resource(url)))
+            if budget is None or budget["reset"] <= time.time():
+                return float("inf")
+            return budget["remaining"]
+
+    def best_token(self, url: str, tokens: list) -> str:
+        "The token with the most requests left for ``url``, the first one on a tie"
+        return max(tokens, key=lambda token: self.remaining(url, token))
+
+    def is_exhausted(self, url: str, token: str = None) -> bool:
+        return self.remaining(url, token) <= 0
+
+    def delay(self, url: str, token: str = None) -> float:
+        "Reserve a request against the budget for ``url`` and return how long to wait before making it"
+        with self._lock:
+            budget = self._budgets.get((token, _get_resource(url)))
+            now = time.time()
+            if budget is None or budget["reset"] <= now:
+                return 0
+            remaining, reset = budget["remaining"], budget["reset"]
+            budget["remaining"] = remaining - 1
+            if remaining <= 0:
+                return reset - now
+            # Without the limit there's no telling how big the reserve should be
+            if not budget["limit"] or remaining >= int(budget["limit"] * self.reserve):
+                return 0
+            # One more gap than requests left, so the last one is made before the reset
+            budget["next_slot"] = max(budget["next_slot"], now) + (reset - now) / (remaining + 1)
+            return budget["next_slot"] - now
+
+    def wait(self, url: str, token: str = None) -> None:
+        delay = self.delay(url, token)
+        if delay > self.max_wait:
+            reset = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() + delay))
+            raise RateLimitExceeded(f"The GitHub API rate limit has been used up until {reset}")
+        if delay > 0:
+            sleep(delay)
@@ -0,0 +1,37 @@
+from rich.text import Text
+
+from the_well_maintained_test.answers import get_answer_data
+from the_well_maintained_test.metadata import _get_questions
+
+NO_REPOSITORY_ERROR = "The package doesn't link to a GitHub repository in its project_urls"
+
+
+def package_record(name: str, version: str, vulnerabilities: int, answers: dict, error: str = None) -> dict:
+    """The answers for a package as a JSON serialisable record.
+
+    Each answer has the question, its message without the console markup and
+    the facts behind it. ``answers`` is ``None`` when the package couldn't be
+    evaluated, which is reported in ``error``.
+    """
+    questions = _get_questions().get("question")
+    if answers is None and error is None:
+        error = NO_REPOSITORY_ERROR
+    return {
+        "package": name,
+        "version": version,
+        "vulnerabilities": vulnerabilities,
+        "error": error,
+        "answers": {
+            question: {
+                "question": questions.get(question).get("question_text"),
+                "message": Text.from_markup(message).plain.strip(),
+                "data": get_answer_data(message),
+            }
+            for question, message in (answers or {}).items()
+        },
+    }
+
+
+def report_record(report: tuple) -> dict:
+    "The record for a ``PackageReport``"
+    return package_record(report.name, report.version, report.vulnerabilities, report.answers, report.error)
@@ -0,0 +1,131 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from rich.console import Console
+from rich.padding import Padding
+from rich.table import Column, Table
+
+from the_well_maintained_test.helpers import SORRY_MESSAGE
+from the_well_maintained_test.styles import (
+    answer_padding_style,
+    answer_style,
+    question_style,
+    special_answer_padding_style,
+    warning_style,
+)
+
+INDEX_NAME = "output-index"
+
+
+def print_report(console: Console, questions: dict, vulnerabilities: int, answers) -> None:
+    if vulnerabilities > 0:
+        console.rule("[bold red]Vulnerabilities detected!!!")
+        console.print(
+            Padding(f"There are {vulnerabilities} vulnerabilities in this package", answer_padding_style, style=warning_style)
+        )
+        console.rule()
+
+    for question, message in answers:
+        console.print(questions.get("question").get(question).get("question_text"), style=question_style)
+        padding_style = special_answer_padding_style if question == "5" else answer_padding_style
+        console.print(Padding(message, padding_style, style=answer_style))
+
+
+def print_package(console: Console, questions: dict, report: tuple) -> None:
+    "Print the report for one package of a requirements run, under a rule with its name"
+    console.rule(f"[bold blue] {report.name}")
+    if report.error:
+        console.print(Padding(report.error, answer_padding_style, style=warning_style))
+    elif report.answers is None:
+        console.print(SORRY_MESSAGE)
+    else:
+        print_report(console, questions, report.vulnerabilities, report.answers.items())
+
+
+def report_path(directory: Path, name: str, output: str) -> Path:
+    return Path(directory) / f"output_{name.lower()}.{output}"
+
+
+def _recording_console(width: int) -> Console:
+    "A console that only records, so reports can be rendered on any thread without touching the terminal"
+    return Console(record=True, file=io.StringIO(), width=width)
+
+
+def _save(console: Console, output: str, path: Path) -> Path:
+    if output == "html":
+        console.save_html(str(path))
+    else:
+        console.save_text(str(path))
+    return path
+
+
+def save_report(report: tuple, questions: dict, output: str, directory: Path, width: int = 80) -> Path:
+    "Render the report for one package on its own console and save it as ``output``, html or txt"
+    console = _recording_console(width)
+    print_package(console, questions, report)
+    return _save(console, output, report_path(directory, report.name, output))
+
+
+def _passing(report: tuple) -> str:
+    if report.answers is None:
+        return ""
+    passing = sum(1 for message in report.answers.values() if str(message).startswith("[green]"))
+    return f"{passing}/{len(report.answers)} passing"
+
+
+def save_index(reports: list, output: str, directory: Path, width: int = 80) -> Path:
+    "Save a table of every package with how many of its answers pass, or why it failed, and a link to its report"
+    table = Table(
+        "package", "version", "vulnerabilities", "result", Column("report", no_wrap=True), title="the-well-maintained-test"
+    )
+    for report in sorted(reports, key=lambda report: report.name.lower()):
+        file_name = report_path(directory, report.name, output).name
+        table.add_row(
+            report.name,
+            report.version or "",
+            str(report.vulnerabilities),
+            report.error or _passing(report) or "no GitHub repository",
+            f"[link={file_name}]{file_name}[/link]" if output == "html" else file_name,
+        )
+    console = _recording_console(width)
+    console.print(table)
+    return _save(console, output, Path(directory) / f"{INDEX_NAME}.{output}")
+
+
+class ReportWriter:
+    """Saves each package's report to its own file on a pool of ``workers``
+    threads, so rendering overlaps with evaluating the packages still
+    running. With ``index`` an index of every report is saved once all of
+    them are written.
+    """
+
+    def __init__(
+        self, questions: dict, output: str, directory: Path = Path(), workers: int = 4, index: bool = False, width: int = 80
+    ):
+        self.questions = questions
+        self.output = output
+        self.directory = Path(directory)
+        self.index = index
+        self.width = width
+        self.reports = []
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._futures = []
+
+    def write(self, report: tuple) -> None:
+        self.reports.append(report)
+        self._futures.append(self._executor.submit(save_report, report, self.questions, self.output, self.directory, self.width))
+
+    def close(self) -> list:
+        "Wait for every report to be written and return their paths, with the index last when there is one"
+        self._executor.shutdown(wait=True)
+        paths = [future.result() for future in self._futures]
+        if self.index:
+            paths.append(save_index(self.reports, self.output, self.directory, self.width))
+        return paths
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -1,29 +1,51 @@
 import json
 import re
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from gettext import ngettext
-from operator import attrgetter
+from math import ceil
 from pathlib import Path
+from statistics import median
 from time import localtime, strftime
 
 import requests
 from rich.progress import Progress
 from rich.prompt import Prompt
 
+from the_well_maintained_test import client, profiling
+from the_well_maintained_test.answers import Answer
 from the_well_maintained_test.console import console
+from the_well_maintained_test.defaults import DEFAULT_WORKERS
 from the_well_maintained_test.helpers import (
+    _get_archive_test_files,
+    _get_auth_tokens,
     _get_bug_comment_list,
     _get_content,
+    _get_pages,
     _get_release_date,
     _get_test_files,
     _test_method_count,
 )
 
+# Question 4 looks at no more than this many of the most recent open bugs
+MAX_BUGS = 300
 
-def production_ready_check(pypi_api_url: str) -> str:
-    response = requests.get(pypi_api_url).json()
-    classifiers = response.get("info").get("classifiers")
-    version = response.get("info").get("version")
+
+def _map(function, items: list, workers: int):
+    """Yield ``function`` of each of ``items`` in order, ``workers`` at a time
+    on a thread pool, or one after another on this thread when ``workers`` is 1.
+    """
+    if workers <= 1:
+        yield from map(function, items)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(profiling.in_current_stage(function), items)
+
+
+def production_ready_check(pypi_data: dict) -> str:
+    classifiers = pypi_data.get("info").get("classifiers")
+    version = pypi_data.get("info").get("version")
     try:
         development_status = [s for s in classifiers if "Development Status" in s][0]
         development_status_start_point = re.search(r"Development Status :: [\d] \- ", development_status).span()[1]
@@ -34,80 +56,129 @@ def production_ready_check(pypi_api_url: str) -> str:
     if development_status:
         message = f"[green]The project is set to Development Status [underline]{status}"
     else:
+        status = None
         message = f"[red]There is no Development Status for this package. It is currently at version {version}"
-    return message
+    return Answer(message, development_status=status, version=version)
 
 
-def documentation_exists(pypi_api_url: str) -> str:
-    response = requests.get(pypi_api_url).json()
-    docs = response.get("info").get("project_urls").get("Documentation")
+def documentation_exists(pypi_data: dict) -> str:
+    docs = pypi_data.get("info").get("project_urls").get("Documentation")
     if docs:
         message = f"[green]Documentation can be found at {docs}"
     else:
         message = "[red]There is no documentation for this project"
-    return message
+    return Answer(message, documentation_url=docs or None)
 
 
-def change_log_check(changelog_url: str) -> str:
-    project_urls = requests.get(changelog_url).json().get("info").get("project_urls")
+def change_log_check(pypi_data: dict) -> str:
+    project_urls = pypi_data.get("info").get("project_urls")
     change_log_types = ["Release notes", "Changelog"]
     if any(item in change_log_types for item in list(project_urls.keys())):
-        return "[green]Yes"
+        return Answer("[green]Yes", changelog=True)
     else:
-        return "[red]No"
+        return Answer("[red]No", changelog=False)
 
 
-def bug_responding(bugs_url: str, headers: dict) -> str:
+def bug_responding(bugs_url: str, headers: dict, workers: int = DEFAULT_WORKERS, max_bugs: int = MAX_BUGS) -> str:
     """
     4. Is someone responding to bug reports?
+
+    Pages through up to ``max_bugs`` open bugs and fetches their timelines
+    ``workers`` at a time to find how long each one waited for a first comment.
     """
+    bugs = _get_open_bugs(bugs_url, headers, max_bugs)
+    comment_lists = _map(lambda bug: _get_bug_comment_list(bug.get("timeline_url"), headers=headers), bugs, workers)
+    return _bug_responding_answer(bugs, list(comment_lists) if bugs else [])
 
-    r = requests.get(bugs_url, headers=headers).json()
-    open_bug_count = len(r)
-    bug_comment_list = []
-    if open_bug_count == 0:
-        message = "[green]There have been no bugs reported that are still open."
-    else:
-        for i in r:
-            bug_create_date = datetime.strptime(i.get("created_at"), "%Y-%m-%dT%H:%M:%SZ")
-            bug_comment_list = _get_bug_comment_list(i.get("timeline_url"), headers=headers)
-        bug_comment_list = sorted(bug_comment_list, key=attrgetter("create_date"), reverse=True)
-        if bug_comment_list:
-            bug_turn_around_time_reply_days = (bug_comment_list[0].create_date - bug_create_date).days
-            # If bug_comment_list[0].create_date is naive, make it timezone-aware
-            if bug_comment_list[0].create_date.tzinfo is None:
-                create_date = bug_comment_list[0].create_date.replace(tzinfo=timezone.utc)
-            else:
-                create_date = bug_comment_list[0].create_date
-            days_since_last_bug_comment = (datetime.now(timezone.utc) - create_date).days
-            # TODO: add logic to better colorize the message
-            message1 = f"The maintainer took {bug_turn_around_time_reply_days} "
-            message1 += "days to respond to the bug report"
-            message2 = f"It has been {days_since_last_bug_comment} days since a comment was made on the bug."
-            message = f"[green]{message1}\n{message2}"
-        else:
-            verb = ngettext("is", "are", open_bug_count)
-            message = f"[red]There {verb} {open_bug_count} bugs with no comments"
-    return message
 
+def _get_open_bugs(bugs_url: str, headers: dict, max_bugs: int = MAX_BUGS) -> list:
+    "The most recent open bugs, without the pull requests the issues endpoint also lists"
+    return [bug for bug in _get_pages(bugs_url, headers, max_bugs) if "pull_request" not in bug]
 
-def check_tests(tree_url: str, headers: dict, show_progress: bool = True) -> str:
+
+def _bug_responding_answer(bugs: list, comment_lists: list) -> str:
+    "Answer question 4 from the open ``bugs`` and the comments on each of them"
+    open_bug_count = len(bugs)
+    if open_bug_count == 0:
+        return Answer("[green]There have been no bugs reported that are still open.", open_bugs=0, responded_bugs=0)
+
+    response_times = []
+    last_comment_date = None
+    for bug, bug_comment_list in zip(bugs, comment_lists):
+        if not bug_comment_list:
+            continue
+        bug_create_date = _as_utc(datetime.strptime(bug.get("created_at"), "%Y-%m-%dT%H:%M:%SZ"))
+        comment_dates = [_as_utc(comment.create_date) for comment in bug_comment_list]
+        response_times.append(min(comment_dates) - bug_create_date)
+        if last_comment_date is None or max(comment_dates) > last_comment_date:
+            last_comment_date = max(comment_dates)
+
+    if not response_times:
+        verb = ngettext("is", "are", open_bug_count)
+        return Answer(f"[red]There {verb} {open_bug_count} bugs with no comments", open_bugs=open_bug_count, responded_bugs=0)
+    median_days = median(response_times).days
+    p90_days = _percentile(response_times, 90).days
+    days_since_last_bug_comment = (datetime.now(timezone.utc) - last_comment_date).days
+    # TODO: add logic to better colorize the message
+    message1 = f"The maintainer responded to {len(response_times)} of {open_bug_count} open bugs"
+    message2 = f"The median time to a first response was {median_days} days, and 90% had one within {p90_days} days"
+    message3 = f"It has been {days_since_last_bug_comment} days since a comment was made on a bug."
+    return Answer(
+        f"[green]{message1}\n{message2}\n{message3}",
+        open_bugs=open_bug_count,
+        responded_bugs=len(response_times),
+        median_response_days=median_days,
+        p90_response_days=p90_days,
+        days_since_last_comment=days_since_last_bug_comment,
+    )
+
+
+def _as_utc(date: datetime) -> datetime:
+    if date.tzinfo is None:
+        return date.replace(tzinfo=timezone.utc)
+    return date
+
+
+def _percentile(values: list, percent: int):
+    "Nearest-rank percentile of ``values``"
+    values = sorted(values)
+    return values[max(ceil(len(values) * percent / 100) - 1, 0)]
+
+
+def check_tests(
+    tree_url: str, headers: dict, show_progress: bool = True, archive_url: str = None, workers: int = DEFAULT_WORKERS
+) -> str:
     """
     5. Are there sufficient tests?
+
+    With ``archive_url`` the tests are counted from one download of the
+    repository tarball instead of one API call per test file. Otherwise, or
+    when the tarball can't be downloaded, up to ``workers`` test files are
+    fetched at the same time.
     """
-    test_list = _get_test_files(tree_url, headers=headers)
-    total = len(test_list)
-    test_files = 0
-    test_functions = 0
-    with Progress() as progress:
-        test_file_reading_task = progress.add_task("[green]Processing...", total=total, visible=show_progress)
-        for i in test_list:
-            content = _get_content(i.get("url"), headers)
-            test_count = _test_method_count(content)
-            test_files += 1
-            test_functions = test_functions + test_count
-            progress.update(test_file_reading_task, advance=1)
-        progress.remove_task(test_file_reading_task)
+    test_list = None
+    if archive_url:
+        try:
+            test_list = _get_archive_test_files(archive_url, headers)
+        except (requests.RequestException, tarfile.TarError):
+            # Empty repositories have no tarball, and some tokens can't download one
+            pass
+    if test_list is None:
+        test_list = _get_test_files(tree_url, headers=headers)
+        with Progress(disable=not show_progress) as progress:
+            test_file_reading_task = progress.add_task("[green]Processing...", total=len(test_list), visible=show_progress)
+            contents = _map(lambda test: _get_content(test.get("url"), headers), test_list, workers)
+            for test, content in zip(test_list, contents):
+                test["test_count"] = _test_method_count(content)
+                progress.update(test_file_reading_task, advance=1)
+            progress.remove_task(test_file_reading_task)
+    return _check_tests_answer(test_list)
+
+
+def _check_tests_answer(test_list: list) -> str:
+    "Answer question 5 from the test files, each with its ``test_count``"
+    test_files = len(test_list)
+    test_functions = sum(i.get("test_count") for i in test_list)
     if test_files == 0:
         message = "[red]There are 0 tests!"
     else:
@@ -115,75 +186,85 @@ def check_tests(tree_url: str, headers: dict, show_progress: bool = True) -> str
         message = f"[green]There {verb} {test_functions} tests in {test_files} files:\n"
         for test in test_list:
             message += f"- {test.get('path')}\n"
-    return message
+    return Answer(
+        message,
+        test_files=test_files,
+        test_functions=test_functions,
+        paths=[test.get("path") for test in test_list],
+    )
 
 
-def language_check(pypi_url: str) -> str:
+def language_check(pypi_data: dict) -> str:
     """
     6. Are the tests running with the latest Language version?
     """
-    response = requests.get(pypi_url).json()
-    classifiers = response.get("info").get("classifiers")
+    classifiers = pypi_data.get("info").get("classifiers")
     languages = [s.replace("Programming Language :: Python :: ", "Python ") for s in classifiers if "Programming Language" in s]
     message = "[green]The project supports the following programming languages\n"
     for language in languages:
         message += f"- {language}\n"
-    return message
+    return Answer(message, languages=languages)
 
 
 # TODO: reqrite to list all frameworks as rich only shows IPython!
-def framework_check(pypi_url: str) -> str:
+def framework_check(pypi_data: dict) -> str:
     """
     7. Are the tests running with the latest Integration version?
     """
-    response = requests.get(pypi_url).json()
-    classifiers = response.get("info").get("classifiers")
+    classifiers = pypi_data.get("info").get("classifiers")
     frameworks = [s.replace("Framework Django", "Framework").replace(" ::", "") for s in classifiers if "Framework" in s]
+    framework = None
     if frameworks:
         framework = [s for s in classifiers if "Framework" in s][-1].replace(" :: ", " ")
         message = f"[green]The project supports the following framework as it's latest[bold] {framework}"
     else:
         message = "[green]This project has no associated frameworks"
-    return message
+    return Answer(message, frameworks=frameworks, latest_framework=framework)
 
 
 def ci_setup(workflows_url: str, headers: dict) -> str:
     """
     8. Is there a Continuous Integration (CI) configuration?
     """
-    r = requests.get(workflows_url, headers=headers).json()
+    response = client.cached_get(workflows_url, headers=headers)
+    response.raise_for_status()
+    r = response.json()
     if r.get("total_count") > 0:
         workflow_count = r.get("total_count")
         verb = ngettext("is", "are", workflow_count)
         message = f"[green]There {verb} {workflow_count} workflows\n"
         for i in r.get("workflows"):
             message += f"[green]- {i.get('name')}\n"
-        return message
+        return Answer(message, workflow_count=workflow_count, workflows=[i.get("name") for i in r.get("workflows")])
     else:
-        return "[red]There is no CI set up!"
+        return Answer("[red]There is no CI set up!", workflow_count=0, workflows=[])
 
 
 def ci_passing(ci_status_url: str, headers: dict) -> str:
     """
     9. Is the CI passing?
     """
-    r = requests.get(ci_status_url, headers=headers).json()
+    response = client.cached_get(ci_status_url, headers=headers)
+    response.raise_for_status()
+    r = response.json()
     conclusion = None
     try:
         conclusion = r.get("workflow_runs")[0].get("conclusion")
     except IndexError:
         pass
     if conclusion == "success":
-        return "[green]Yes"
+        return Answer("[green]Yes", passing=True, conclusion=conclusion)
     else:
-        return "[red]No"
+        return Answer("[red]No", passing=False, conclusion=conclusion)
 
 
 def well_used(api_url: str, headers: dict) -> str:
     """
     10. Does it seem relatively well used?
     """
-    r = requests.get(api_url, headers=headers).json()
+    response = client.cached_get(api_url, headers=headers)
+    response.raise_for_status()
+    r = response.json()
     watchers = r.get("watchers")
     network_count = r.get("network_count")
     open_issues = r.get("open_issues")
@@ -193,14 +274,18 @@ def well_used(api_url: str, headers: dict) -> str:
     message += f"- Forks: {network_count}\n"
     message += f"- Open Issues: {open_issues}\n"
     message += f"- Subscribers: {subscribers_count}"
-    return f"[green]{message}"
+    return Answer(
+        f"[green]{message}", watchers=watchers, forks=network_count, open_issues=open_issues, subscribers=subscribers_count
+    )
 
 
 def commit_in_last_year(commits_url: str, headers: dict) -> str:
     """
     11. Has there been a commit in the last year?
     """
-    r = requests.get(commits_url, headers=headers).json()
+    response = client.cached_get(commits_url, headers=headers)
+    response.raise_for_status()
+    r = response.json()
     last_commit_date = r.get("commit").get("author").get("date")
     last_commit_date = datetime.strptime(last_commit_date, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
     days_since_last_commit = (datetime.now(timezone.utc) - last_commit_date).days
@@ -210,14 +295,19 @@ def commit_in_last_year(commits_url: str, headers: dict) -> str:
         message = f"[green]Yes. The last commit was on {datetime.strftime(last_commit_date, '%m-%d-%Y')} "
         message += f"which was {days_since_last_commit} days ago"
 
-    return message
+    return Answer(
+        message,
+        commit_in_last_year=days_since_last_commit <= 365,
+        last_commit_date=last_commit_date.isoformat(),
+        days_since_last_commit=days_since_last_commit,
+    )
 
 
-def release_in_last_year(pypi_api_url: str) -> str:
+def release_in_last_year(pypi_data: dict) -> str:
     """
     12. Has there been a release in the last year?
     """
-    r = requests.get(pypi_api_url).json().get("releases")
+    r = pypi_data.get("releases")
     releases = _get_release_date(r)
     last_release_date = releases[0].upload_time
     version = releases[0].version
@@ -229,12 +319,18 @@ def release_in_last_year(pypi_api_url: str) -> str:
         message = f"[green]Yes. The last release was on {datetime.strftime(last_release_date, '%m-%d-%Y')}"
         message += f" which was {days_since_last_release} days ago"
 
-    return message
+    return Answer(
+        message,
+        release_in_last_year=days_since_last_release <= 365,
+        last_release_version=version,
+        last_release_date=last_release_date.isoformat(),
+        days_since_last_release=days_since_last_release,
+    )
 
 
 def get_github_api_rate_limits(headers, resource):
     url = "https://api.github.com/rate_limit"
-    response = requests.get(url, headers=headers).json()
+    response = client.get(url, headers=headers).json()
     core = response.get("resources").get(resource)
     limit = core.get("limit")
     used = core.get("used")
@@ -246,21 +342,26 @@ def get_github_api_rate_limits(headers, resource):
     return message
 
 
-def get_vulnerabilities(url: str) -> int:
-    url = url
-    vulnerabilities = requests.get(url).json().get("vulnerabilities")
+def get_vulnerabilities(pypi_data: dict) -> int:
+    vulnerabilities = pypi_data.get("vulnerabilities")
     vulnerability_count = len(vulnerabilities)
     return vulnerability_count
 
 
-def save_auth(auth: str) -> None:  # pragma: no cover
+def save_auth(auth: str, add: bool = False) -> None:  # pragma: no cover
     # TODO: Write Test
-    "Save authentication credentials to a JSON file"
+    "Save authentication credentials to a JSON file, next to the tokens already in it when ``add`` is set"
     console.print("Create a GitHub personal user token and paste it here:")
     personal_token = Prompt.ask("Personal token")
     if Path(auth).exists():
         auth_data = json.load(open(auth))
     else:
         auth_data = {}
-    auth_data["github_personal_token"] = personal_token
+    if add:
+        tokens = list(dict.fromkeys(_get_auth_tokens(auth_data) + [personal_token]))
+        auth_data["github_personal_token"] = tokens[0]
+        auth_data["github_personal_tokens"] = tokens
+    else:
+        auth_data["github_personal_token"] = personal_token
+        auth_data.pop("github_personal_tokens", None)
     open(auth, "w").write(json.dumps(auth_data, indent=4) + "\n")
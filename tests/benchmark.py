@@ -0,0 +1,90 @@
+"""End-to-end benchmarks against the local fake PyPI and GitHub services.
+
+Times the work behind the ``package`` and ``requirements`` commands for
+synthetic repositories of increasing size, with the blob API and with
+``--archive`` for question 5, and counts the requests each run makes:
+
+    python -m tests.benchmark --sizes 10,100,1000,10000 --latency 0.01
+"""
+
+import argparse
+import time
+
+from rich.console import Console
+from rich.table import Table
+
+from tests.fake_services import FakeServices
+from the_well_maintained_test import client
+from the_well_maintained_test.evaluate import DEFAULT_WORKERS, evaluate_report, evaluate_requirements, set_result_cache
+from the_well_maintained_test.ratelimit import RateLimiter
+
+
+def _reset_client() -> None:
+    client.set_cache(None)
+    set_result_cache(None)
+    client.clear_preloaded()
+    client._rate_limiter = RateLimiter()
+
+
+def run_package(services: FakeServices, name: str, workers: int, archive: bool) -> dict:
+    _reset_client()
+    services.reset_counts()
+    start = time.perf_counter()
+    report = evaluate_report(name, {}, workers=workers, archive=archive)
+    elapsed = time.perf_counter() - start
+    if report.answers is None:
+        raise RuntimeError(f"{name} couldn't be evaluated: {report.error}")
+    return {"seconds": elapsed, "requests": sum(services.requests.values()), "bytes": services.bytes_sent}
+
+
+def run_requirements(services: FakeServices, names: list, jobs: int, workers: int, archive: bool) -> dict:
+    _reset_client()
+    services.reset_counts()
+    start = time.perf_counter()
+    reports = list(evaluate_requirements(names, {}, jobs, workers, archive=archive))
+    elapsed = time.perf_counter() - start
+    if any(report.answers is None for report in reports):
+        raise RuntimeError("Not every package could be evaluated")
+    return {"seconds": elapsed, "requests": sum(services.requests.values()), "bytes": services.bytes_sent}
+
+
+def main(argv: list = None) -> list:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000", help="Comma separated numbers of test files per repository")
+    parser.add_argument("--latency", type=float, default=0.005, help="Seconds added to every response")
+    parser.add_argument("--tests-per-file", type=int, default=20, help="Test functions in every test file")
+    parser.add_argument("--bugs", type=int, default=30, help="Open bugs in every repository")
+    parser.add_argument("--packages", type=int, default=4, help="Packages in the requirements run")
+    parser.add_argument("--jobs", type=int, default=4, help="Packages evaluated concurrently in the requirements run")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Workers for each package")
+    args = parser.parse_args(argv)
+
+    results = []
+    table = Table("command", "test files", "question 5", "seconds", "requests", "KiB")
+    for size in [int(size) for size in args.sizes.split(",")]:
+        names = [f"package-{size}-{i}" for i in range(args.packages)]
+        services = FakeServices(
+            dict.fromkeys(names, size), latency=args.latency, tests_per_file=args.tests_per_file, bugs=args.bugs
+        )
+        with services, services.use(pool_size=args.jobs * args.workers * 2):
+            for archive in (False, True):
+                mode = "archive" if archive else "blobs"
+                package = run_package(services, names[0], args.workers, archive)
+                requirements = run_requirements(services, names, args.jobs, args.workers, archive)
+                for command, result in (("package", package), (f"requirements ({args.packages})", requirements)):
+                    results.append({"command": command, "test_files": size, "mode": mode, **result})
+                    table.add_row(
+                        command,
+                        str(size),
+                        mode,
+                        f"{result['seconds']:.2f}",
+                        str(result["requests"]),
+                        f"{result['bytes'] / 1024:.0f}",
+                    )
+    _reset_client()
+    Console().print(table)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""A local stand-in for the PyPI JSON API and the GitHub REST endpoints the
+checks use, so end-to-end runs and benchmarks work offline.
+
+Every package ``name`` is served from PyPI with a GitHub repository at
+``fake/name`` holding ``test_files`` test files. Requests made through
+``FakeServices.use()`` to https://pypi.org and https://api.github.com are sent
+to the local server over real sockets, with ``latency`` seconds added to
+each response and ``X-RateLimit-*`` headers on every GitHub response.
+``repositories`` points packages at another package's repository instead,
+like the distributions of a monorepo.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import tarfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from the_well_maintained_test import client
+from the_well_maintained_test.lockfiles import _normalize_name
+
+PYPI_URL = "https://pypi.org"
+GITHUB_URL = "https://api.github.com"
+OWNER = "fake"
+
+
+def _test_source(tests: int) -> bytes:
+    lines = ["import pytest", ""]
+    for i in range(tests):
+        lines += ["", f"def test_case_{i}():", f"    assert {i} == {i}", ""]
+    return "\n".join(lines).encode()
+
+
+class _RedirectAdapter(HTTPAdapter):
+    def __init__(self, prefix: str, target: str, **kwargs):
+        super().__init__(**kwargs)
+        self.prefix = prefix
+        self.target = target
+
+    def send(self, request, **kwargs):
+        request.url = self.target + request.url[len(self.prefix) :]
+        return super().send(request, **kwargs)
+
+
+class FakeServices:
+    def __init__(
+        self,
+        packages: dict,
+        latency: float = 0,
+        tests_per_file: int = 5,
+        bugs: int = 3,
+        rate_limit: int = 1_000_000,
+        requires: dict = None,
+        repositories: dict = None,
+    ):
+        self.packages = {_normalize_name(name): test_files for name, test_files in packages.items()}
+        self.requires = {_normalize_name(name): requirements for name, requirements in (requires or {}).items()}
+        self.repositories = {_normalize_name(name): repo for name, repo in (repositories or {}).items()}
+        self.latency = latency
+        self.tests_per_file = tests_per_file
+        self.bugs = bugs
+        self.rate_limit = rate_limit
+        self.reset = int(time.time()) + 3600
+        # One timestamp for every document, so their ETags don't change between requests
+        self.created = time.gmtime()
+        self.requests = Counter()
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._tarballs = {}
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.services = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> "FakeServices":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def session(self, pool_size: int = 50) -> requests.Session:
+        "A session that sends PyPI and GitHub requests to this server"
+        session = requests.Session()
+        session.mount(PYPI_URL, _RedirectAdapter(PYPI_URL, f"{self.url}/pypi-api", pool_maxsize=pool_size))
+        session.mount(GITHUB_URL, _RedirectAdapter(GITHUB_URL, f"{self.url}/github-api", pool_maxsize=pool_size))
+        return session
+
+    @contextmanager
+    def use(self, pool_size: int = 50):
+        "Send every request the checks make through this server"
+        previous = client._session
+        client._session = self.session(pool_size)
+        try:
+            yield self
+        finally:
+            client._session.close()
+            client._session = previous
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.bytes_sent = 0
+
+    def _count(self, route: str, size: int) -> None:
+        with self._lock:
+            self.requests[route] += 1
+            self.bytes_sent += size
+
+    def _github_budget(self) -> int:
+        with self._lock:
+            used = sum(count for route, count in self.requests.items() if route.startswith("github"))
+        return max(self.rate_limit - used, 0)
+
+    def _tarball(self, name: str) -> bytes:
+        with self._lock:
+            if name not in self._tarballs:
+                buffer = io.BytesIO()
+                source = _test_source(self.tests_per_file)
+                with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+                    for path in self._test_paths(name):
+                        info = tarfile.TarInfo(f"{OWNER}-{name}-0000000/{path}")
+                        info.size = len(source)
+                        archive.addfile(info, io.BytesIO(source))
+                self._tarballs[name] = buffer.getvalue()
+            return self._tarballs[name]
+
+    def _test_paths(self, name: str) -> list:
+        return [f"tests/test_module_{i}.py" for i in range(self.packages[name])]
+
+    def pypi_document(self, name: str) -> dict:
+        repo = self.repositories.get(name, name)
+        return {
+            "info": {
+                "name": name,
+                "version": "1.0.0",
+                "requires_dist": self.requires.get(name),
+                "classifiers": [
+                    "Development Status :: 5 - Production/Stable",
+                    "Framework :: Django",
+                    "Programming Language :: Python :: 3.13",
+                ],
+                "project_urls": {
+                    "Documentation": f"https://{name}.readthedocs.io",
+                    "Changelog": f"https://github.com/{OWNER}/{repo}/releases",
+                    "Source": f"https://github.com/{OWNER}/{repo}",
+                },
+            },
+            "releases": {"1.0.0": [{"upload_time": time.strftime("%Y-%m-%dT%H:%M:%S", self.created)}]},
+            "vulnerabilities": [],
+        }
+
+    def github_document(self, name: str, path: str):
+        "The route and document GitHub serves for ``path`` within repos/fake/name"
+        repo_url = f"{GITHUB_URL}/repos/{OWNER}/{name}"
+        now = time.strftime("%Y-%m-%dT%H:%M:%SZ", self.created)
+        if path == "":
+            return "github-repo", {
+                "default_branch": "main",
+                "watchers": 100,
+                "network_count": 10,
+                "open_issues": self.bugs,
+                "subscribers_count": 5,
+            }
+        if path == "/commits/main":
+            return "github-commit", {"sha": "a" * 40, "commit": {"author": {"date": now}, "tree": {"sha": "b" * 40}}}
+        if path == "/actions/workflows":
+            return "github-workflows", {"total_count": 1, "workflows": [{"name": "Test"}]}
+        if path == "/actions/runs":
+            return "github-runs", {"workflow_runs": [{"id": 1, "conclusion": "success"}]}
+        if path == "/issues":
+            return "github-issues", [
+                {"number": i, "created_at": now, "timeline_url": f"{repo_url}/issues/{i}/timeline"} for i in range(self.bugs)
+            ]
+        if path.startswith("/issues/") and path.endswith("/timeline"):
+            return "github-timeline", [{"event": "commented", "created_at": now, "body": "Thanks!"}]
+        if path == "/git/trees/main":
+            tree = [{"type": "blob", "path": "README.md", "url": f"{repo_url}/git/blobs/readme"}]
+            tree += [
+                {"type": "blob", "path": test_path, "url": f"{repo_url}/git/blobs/{i}"}
+                for i, test_path in enumerate(self._test_paths(name))
+            ]
+            return "github-tree", {"tree": tree}
+        if path.startswith("/git/blobs/"):
+            content = base64.b64encode(_test_source(self.tests_per_file)).decode()
+            return "github-blob", {"encoding": "base64", "content": content}
+        if path == "/tarball/main":
+            return "github-tarball", self._tarball(name)
+        return None, None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        services = self.server.services
+        if services.latency:
+            time.sleep(services.latency)
+        url = urlparse(self.path)
+        parts = url.path.split("/") + [""] * 5
+        route, document, headers = None, None, {}
+        if url.path.startswith("/pypi-api/pypi/") and _normalize_name(parts[3]) in services.packages:
+            route, document = "pypi", services.pypi_document(_normalize_name(parts[3]))
+        elif url.path == "/github-api/rate_limit":
+            route = "rate_limit"
+            document = {"resources": {"core": {"limit": services.rate_limit, "remaining": services._github_budget()}}}
+        elif url.path.startswith(f"/github-api/repos/{OWNER}/") and parts[4] in services.packages:
+            if services._github_budget() == 0:
+                return self._send("github-limited", 403, {"message": "API rate limit exceeded"})
+            route, document = services.github_document(parts[4], url.path[len(f"/github-api/repos/{OWNER}/{parts[4]}") :])
+            if route == "github-issues":
+                document, headers = self._paginate(document, url)
+        if route is None:
+            return self._send("not-found", 404, {"message": "Not Found"})
+        self._send(route, 200, document, headers)
+
+    def _paginate(self, items: list, url) -> tuple:
+        query = parse_qs(url.query)
+        per_page = int(query.get("per_page", ["30"])[0])
+        page = int(query.get("page", ["1"])[0])
+        headers = {}
+        if page * per_page < len(items):
+            query["page"] = [str(page + 1)]
+            next_query = "&".join(f"{key}={value[0]}" for key, value in query.items())
+            headers["Link"] = f'<{GITHUB_URL}{url.path[len("/github-api") :]}?{next_query}>; rel="next"'
+        return items[(page - 1) * per_page : page * per_page], headers
+
+    def _send(self, route: str, status: int, document, headers: dict = None) -> None:
+        services = self.server.services
+        if isinstance(document, bytes):
+            body, content_type = document, "application/x-gzip"
+        else:
+            body, content_type = json.dumps(document).encode(), "application/json"
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            status, body = 304, b""
+        services._count(route, len(body))
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        for header, value in (headers or {}).items():
+            self.send_header(header, value)
+        if route.startswith("github"):
+            self.send_header("X-RateLimit-Limit", str(services.rate_limit))
+            self.send_header("X-RateLimit-Remaining", str(services._github_budget()))
+            self.send_header("X-RateLimit-Reset", str(services.reset))
+            self.send_header("X-RateLimit-Resource", "core")
+        self.end_headers()
+        self.wfile.write(body)
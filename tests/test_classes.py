@@ -14,6 +14,10 @@ BAD_DATE_Z = datetime.strftime(today + timedelta(days=random_days_bad), "%Y-%m-%
 
 class MockResponseCIPassing:
     # mock json() method always returns a specific testing dictionary
+    @staticmethod
+    def raise_for_status():
+        pass
+
     @staticmethod
     def json():
         return {"workflow_runs": [{"conclusion": "success"}]}
@@ -21,6 +25,10 @@ class MockResponseCIPassing:
 
 class MockResponseCINoConclusion:
     # mock json() method always returns a specific testing dictionary
+    @staticmethod
+    def raise_for_status():
+        pass
+
     @staticmethod
     def json():
         return {"workflow_runs": []}
@@ -28,12 +36,20 @@ class MockResponseCINoConclusion:
 
 class MockResponseCIFailing:
     # mock json() method always returns a specific testing dictionary
+    @staticmethod
+    def raise_for_status():
+        pass
+
     @staticmethod
     def json():
         return {"workflow_runs": [{"conclusion": "fail"}]}
 
 
 class MockResponseWellUsed:
+    @staticmethod
+    def raise_for_status():
+        pass
+
     @staticmethod
     def json():
         return {
@@ -45,12 +61,20 @@ class MockResponseWellUsed:
 
 
 class MockResponseCommitsYes:
+    @staticmethod
+    def raise_for_status():
+        pass
+
     @staticmethod
     def json():
         return {"commit": {"author": {"date": GOOD_DATE_Z}}}
 
 
 class MockResponseCommitsNo:
+    @staticmethod
+    def raise_for_status():
+        pass
+
     @staticmethod
     def json():
         return {"commit": {"author": {"date": BAD_DATE_Z}}}
@@ -74,18 +98,32 @@ class MockResponseReleasesNo:
 
 
 class MockResponseCISetUpYes:
+    @staticmethod
+    def raise_for_status():
+        pass
+
     @staticmethod
     def json():
         return {"total_count": 1, "workflows": [{"name": "Test"}]}
 
 
 class MockResponseCISetUpNo:
+    @staticmethod
+    def raise_for_status():
+        pass
+
     @staticmethod
     def json():
         return {"total_count": 0}
 
 
 class MockResponseBugsYes:
+    links = {}
+
+    @staticmethod
+    def raise_for_status():
+        pass
+
     @staticmethod
     def json():
         return [
@@ -127,12 +165,24 @@ class MockResponseBugsYes:
 
 
 class MockResponseBugsNo:
+    links = {}
+
+    @staticmethod
+    def raise_for_status():
+        pass
+
     @staticmethod
     def json():
         return []
 
 
 class MockResponseBugsWithNoResponse:
+    links = {}
+
+    @staticmethod
+    def raise_for_status():
+        pass
+
     @staticmethod
     def json():
         return [
@@ -227,6 +277,12 @@ class MockResponseFrameworkCheck:
 
 
 class MockResponseCommentList:
+    links = {}
+
+    @staticmethod
+    def raise_for_status():
+        pass
+
     @staticmethod
     def json():
         return [
@@ -239,6 +295,10 @@ class MockResponseCommentList:
 
 
 class MockGitHubFileCheckAPIWithTestFiles:
+    @staticmethod
+    def raise_for_status():
+        pass
+
     @staticmethod
     def json():
         return {
@@ -274,6 +334,10 @@ class MockGitHubFileCheckAPIWithTestFiles:
 
 
 class MockGitHubFileCheckAPIWithOutTestFiles:
+    @staticmethod
+    def raise_for_status():
+        pass
+
     @staticmethod
     def json():
         return {
@@ -301,18 +365,34 @@ class MockGitHubFileCheckAPIWithOutTestFiles:
 
 
 class MockResponseContentBase64:
+    status_code = 200
+
+    @staticmethod
+    def raise_for_status():
+        pass
+
     @staticmethod
     def json():
         return {"encoding": "base64", "content": "test"}
 
 
 class MockResponseContentNotBase64:
+    status_code = 200
+
+    @staticmethod
+    def raise_for_status():
+        pass
+
     @staticmethod
     def json():
         return {"encoding": "notbase64"}
 
 
 class MockResponseTestFilesExist:
+    @staticmethod
+    def raise_for_status():
+        pass
+
     @staticmethod
     def json():
         return {
@@ -330,6 +410,10 @@ class MockResponseTestFilesExist:
 
 
 class MockResponseTestFilesDoNotExist:
+    @staticmethod
+    def raise_for_status():
+        pass
+
     @staticmethod
     def json():
         return {
@@ -343,6 +427,10 @@ class MockResponseTestFilesDoNotExist:
 
 
 class MockResponseTestFilesNoBlobs:
+    @staticmethod
+    def raise_for_status():
+        pass
+
     @staticmethod
     def json():
         return {"tree": [{"type": "tree"}]}
@@ -368,6 +456,9 @@ class MockResponseProjectURLs:
 
 class MockResponseGitHubRateLimit:
     # mock json() method always returns a specific testing dictionary
+    status_code = 200
+    headers = {}
+
     @staticmethod
     def json():
         return {
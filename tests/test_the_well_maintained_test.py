@@ -1,11 +1,23 @@
+import asyncio
+import base64
+import io
+import json
+import subprocess
+import sys
+import tarfile
+import threading
+import zipfile
 from collections import namedtuple
 from datetime import date, datetime, timezone
-from time import localtime, strftime
+from pathlib import Path
+from time import localtime, perf_counter, sleep, strftime
 
 import pytest
 import requests
+import toml
 from click.testing import CliRunner
 
+from tests.fake_services import FakeServices
 from tests.test_classes import (
     BAD_DATE,
     BAD_DATE_Z,
@@ -46,12 +58,53 @@ from tests.test_classes import (
     MockResponseWithoutVulnerabilities,
     MockResponseWithVulnerabilities,
 )
+from the_well_maintained_test import client, profiling
+from the_well_maintained_test.answers import Answer
+from the_well_maintained_test.bundle import Bundle, BundleWriter
+from the_well_maintained_test.cache import HTTPCache, ResultCache
 from the_well_maintained_test.cli import cli
+from the_well_maintained_test.console import console, recording
+from the_well_maintained_test.errors import RateLimitExceeded
+from the_well_maintained_test.evaluate import (
+    DEFAULT_ASYNC_CONCURRENCY,
+    GITHUB_QUESTIONS,
+    PackageReport,
+    _get_markers,
+    _get_package_repo,
+    _get_package_urls,
+    _get_repo_urls,
+    evaluate_async,
+    evaluate_package,
+    evaluate_report,
+    evaluate_requirements,
+    evaluate_requirements_async,
+    evaluate_tree,
+    set_async_concurrency,
+    set_result_cache,
+)
+from the_well_maintained_test.graphql import (
+    GRAPHQL_URL,
+    _get_repositories_query,
+    _get_rest_documents,
+    get_repository_facts,
+    preload_repositories,
+)
 from the_well_maintained_test.helpers import (
+    _get_headers,
     _get_package_github_url,
-    _get_requirements_txt_file,
+    _get_package_snapshot,
+    _get_pages,
+    _get_requires_dist,
+    _get_tokens,
+    _source_test_method_count,
 )
+from the_well_maintained_test.lockfiles import _get_requirements_txt_packages, get_packages
+from the_well_maintained_test.metadata import _get_questions, _get_urls
+from the_well_maintained_test.ratelimit import RateLimiter
+from the_well_maintained_test.records import NO_REPOSITORY_ERROR, package_record, report_record
+from the_well_maintained_test.reports import ReportWriter
 from the_well_maintained_test.utils import (
+    _get_archive_test_files,
     _get_bug_comment_list,
     _get_content,
     _get_release_date,
@@ -82,35 +135,23 @@ def test_version():
         assert result.output.startswith("cli, version ")
 
 
-def test_changelog_exists(monkeypatch):
+def test_changelog_exists():
     """
     3. Is there a changelog?
     """
 
-    def mock_get(*args, **kwargs):
-        return MockResponseChangelogYes()
-
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
-    url = "https://fakeurl"
     expected = "[green]Yes"
-    actual = change_log_check(url)
+    actual = change_log_check(MockResponseChangelogYes.json())
     assert actual == expected
 
 
-def test_changelog_does_not_exist(monkeypatch):
+def test_changelog_does_not_exist():
     """
     3. Is there a changelog?
     """
 
-    def mock_get(*args, **kwargs):
-        return MockResponseChangelogNo()
-
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
-    url = "https://fakeurl"
     expected = "[red]No"
-    actual = change_log_check(url)
+    actual = change_log_check(MockResponseChangelogNo.json())
     assert actual == expected
 
 
@@ -127,7 +168,7 @@ def test_bug_response_yes(monkeypatch):
     def mock_get(*args, **kwargs):
         return MockResponseBugsYes()
 
-    monkeypatch.setattr(requests, "get", mock_get)
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     url = "https://fakeurl/17/timeline"
 
     headers = {}
@@ -141,9 +182,13 @@ def test_bug_response_yes(monkeypatch):
 
     days_since_last_bug_comment = 0
     expected = bug_responding(url, headers=headers)
-    message1 = f"The maintainer took {bug_turn_around_time_reply_days} days to respond to the bug report"
-    message2 = f"It has been {days_since_last_bug_comment} days since a comment was made on the bug."
-    actual = f"[green]{message1}\n{message2}"
+    message1 = "The maintainer responded to 3 of 3 open bugs"
+    message2 = (
+        f"The median time to a first response was {bug_turn_around_time_reply_days} days, "
+        f"and 90% had one within {bug_turn_around_time_reply_days} days"
+    )
+    message3 = f"It has been {days_since_last_bug_comment} days since a comment was made on a bug."
+    actual = f"[green]{message1}\n{message2}\n{message3}"
     assert expected == actual
 
 
@@ -160,6 +205,12 @@ def test_bug_response_timezone_aware_date(monkeypatch):
 
     # Custom mock that returns timezone-aware bug_create_date
     class MockResponseBugsTimezoneAware:
+        links = {}
+
+        @staticmethod
+        def raise_for_status():
+            pass
+
         @staticmethod
         def json():
             return [
@@ -205,14 +256,14 @@ def test_bug_response_timezone_aware_date(monkeypatch):
     the_well_maintained_test.utils.datetime = MockDatetime
 
     try:
-        monkeypatch.setattr(requests, "get", mock_get)
+        monkeypatch.setattr(requests.Session, "get", mock_get)
         monkeypatch.setattr("the_well_maintained_test.utils._get_bug_comment_list", mock_get_bug_comment)
 
         url = "https://fakeurl/17/timeline"
         expected = bug_responding(url, headers=headers)
 
-        assert expected.startswith("[green]")
-        assert "days to respond to the bug report" in expected
+        assert expected.startswith("[green]The maintainer responded to 1 of 1 open bugs")
+        assert "The median time to a first response was 1 days" in expected
 
     finally:
         the_well_maintained_test.utils.datetime = original_datetime_class
@@ -230,7 +281,7 @@ def test__get_bug_comment_list(monkeypatch):
     def mock_get(*args, **kwargs):
         return MockResponseCommentList()
 
-    monkeypatch.setattr(requests, "get", mock_get)
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     url = "https://fakeurl/17/timeline"
     actual = _get_bug_comment_list(url, headers=headers)
     expected = [
@@ -242,6 +293,66 @@ def test__get_bug_comment_list(monkeypatch):
     assert actual == expected
 
 
+class MockResponsePage:
+    def __init__(self, items, next_url=None):
+        self.items = items
+        self.links = {"next": {"url": next_url}} if next_url else {}
+
+    def json(self):
+        return self.items
+
+    def raise_for_status(self):
+        pass
+
+
+def test__get_pages(monkeypatch):
+    pages = {
+        "https://fakeurl?page=1": MockResponsePage([1, 2], "https://fakeurl?page=2"),
+        "https://fakeurl?page=2": MockResponsePage([3, 4], "https://fakeurl?page=3"),
+        "https://fakeurl?page=3": MockResponsePage([5]),
+    }
+    requested = []
+
+    def mock_get(self, url, headers=None, **kwargs):
+        requested.append(url)
+        return pages[url]
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    assert _get_pages("https://fakeurl?page=1", {}) == [1, 2, 3, 4, 5]
+    assert len(requested) == 3
+    assert _get_pages("https://fakeurl?page=1", {}, limit=3) == [1, 2, 3]
+    assert len(requested) == 5
+
+
+def test_bug_response_across_pages(monkeypatch):
+    def bug(number, created_at, **kwargs):
+        return {"number": number, "created_at": created_at, "timeline_url": f"https://fakeurl/{number}/timeline", **kwargs}
+
+    def comments(*dates):
+        return MockResponsePage([{"event": "commented", "created_at": d, "body": ""} for d in dates])
+
+    pages = {
+        "https://fakeurl/issues": MockResponsePage(
+            [bug(1, "2021-01-01T00:00:00Z"), bug(2, "2021-01-01T00:00:00Z", pull_request={})], "https://fakeurl/issues?page=2"
+        ),
+        "https://fakeurl/issues?page=2": MockResponsePage(
+            [bug(3, "2021-01-01T00:00:00Z"), bug(4, "2021-01-01T00:00:00Z"), bug(5, "2021-01-01T00:00:00Z")]
+        ),
+        "https://fakeurl/1/timeline": comments("2021-01-03T00:00:00Z", "2021-01-02T00:00:00Z"),
+        "https://fakeurl/3/timeline": comments("2021-01-11T00:00:00Z"),
+        "https://fakeurl/4/timeline": comments("2021-02-01T00:00:00Z", "2021-06-01T00:00:00Z"),
+        "https://fakeurl/5/timeline": MockResponsePage([]),
+    }
+    monkeypatch.setattr(requests.Session, "get", lambda self, url, **kwargs: pages[url])
+    actual = bug_responding("https://fakeurl/issues", {}, workers=3)
+    days_since_last_bug_comment = (datetime.now(timezone.utc) - datetime(2021, 6, 1, tzinfo=timezone.utc)).days
+    assert actual == (
+        "[green]The maintainer responded to 3 of 4 open bugs\n"
+        "The median time to a first response was 10 days, and 90% had one within 31 days\n"
+        f"It has been {days_since_last_bug_comment} days since a comment was made on a bug."
+    )
+
+
 def test_bug_response_no(monkeypatch):
     """
     4. Is someone responding to bug reports?
@@ -251,8 +362,8 @@ def test_bug_response_no(monkeypatch):
     def mock_get(*args, **kwargs):
         return MockResponseBugsNo()
 
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
+    # apply the monkeypatch for requests.Session.get to mock_get
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     url = "https://fakeurl"
     actual = bug_responding(url, headers=headers)
     expected = "[green]There have been no bugs reported that are still open."
@@ -268,8 +379,8 @@ def test_bug_response_yes_no_response(monkeypatch):
     def mock_get(*args, **kwargs):
         return MockResponseBugsWithNoResponse()
 
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
+    # apply the monkeypatch for requests.Session.get to mock_get
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     url = "https://fakeurl"
     actual = bug_responding(url, headers=headers)
     expected = "[red]There is 1 bugs with no comments"
@@ -285,8 +396,8 @@ def test_ci_setup_yes(monkeypatch):
     def mock_get(*args, **kwargs):
         return MockResponseCISetUpYes()
 
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
+    # apply the monkeypatch for requests.Session.get to mock_get
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     url = "https://fakeurl"
     actual = ci_setup(url, headers=headers)
     expected = "[green]There is 1 workflows\n[green]- Test\n"
@@ -302,8 +413,8 @@ def test_ci_setup_no(monkeypatch):
     def mock_get(*args, **kwargs):
         return MockResponseCISetUpNo()
 
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
+    # apply the monkeypatch for requests.Session.get to mock_get
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     url = "https://fakeurl"
     actual = ci_setup(url, headers=headers)
     expected = "[red]There is no CI set up!"
@@ -319,12 +430,13 @@ def test_ci_passing_yes(monkeypatch):
     def mock_get(*args, **kwargs):
         return MockResponseCIPassing()
 
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
+    # apply the monkeypatch for requests.Session.get to mock_get
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     url = "https://fakeurl"
     actual = ci_passing(url, headers=headers)
     expected = "[green]Yes"
     assert actual == expected
+    assert actual.data == {"passing": True, "conclusion": "success"}
 
 
 def test_ci_passing_no_conclusion(monkeypatch):
@@ -336,8 +448,8 @@ def test_ci_passing_no_conclusion(monkeypatch):
     def mock_get(*args, **kwargs):
         return MockResponseCINoConclusion()
 
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
+    # apply the monkeypatch for requests.Session.get to mock_get
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     url = "https://fakeurl"
     actual = ci_passing(url, headers=headers)
     expected = "[red]No"
@@ -353,8 +465,8 @@ def test_ci_passing_no(monkeypatch):
     def mock_get(*args, **kwargs):
         return MockResponseCIFailing()
 
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
+    # apply the monkeypatch for requests.Session.get to mock_get
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     url = "https://fakeurl"
     actual = ci_passing(url, headers=headers)
     expected = "[red]No"
@@ -370,8 +482,8 @@ def test_well_used(monkeypatch):
     def mock_get(*args, **kwargs):
         return MockResponseWellUsed()
 
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
+    # apply the monkeypatch for requests.Session.get to mock_get
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     url = "https://fakeurl"
     actual = well_used(url, headers=headers)
     message = "The project has the following statistics:\n"
@@ -398,8 +510,8 @@ def test_commit_in_last_year_yes(monkeypatch):
     test_date = datetime.strptime(GOOD_DATE_Z, "%Y-%m-%dT%H:%M:%SZ")
     days = (today - test_date).days
 
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
+    # apply the monkeypatch for requests.Session.get to mock_get
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     url = "https://fakeurl"
     actual = commit_in_last_year(url, headers=headers)
     expected = f"[green]Yes. The last commit was on {datetime.strftime(test_date, '%m-%d-%Y')} which was {days} days ago"
@@ -419,163 +531,109 @@ def test_commit_in_last_year_no(monkeypatch):
     test_date = datetime.strptime(BAD_DATE_Z, "%Y-%m-%dT%H:%M:%SZ")
     days = (today - test_date).days
 
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
+    # apply the monkeypatch for requests.Session.get to mock_get
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     url = "https://fakeurl"
     actual = commit_in_last_year(url, headers=headers)
     expected = f"[red]No. The last commit was {days} days ago"
     assert actual == expected
 
 
-def test_release_in_last_year_yes(monkeypatch):
+def test_release_in_last_year_yes():
     """
     12. Has there been a release in the last year?
     """
 
-    def mock_get(*args, **kwargs):
-        return MockResponseReleasesYes()
-
     today = datetime.now()
     test_date = datetime.strptime(GOOD_DATE, "%Y-%m-%dT%H:%M:%S")
 
     days = (today - test_date).days
 
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
-    url = "https://fakeurl"
-    actual = release_in_last_year(url)
+    actual = release_in_last_year(MockResponseReleasesYes.json())
     expected = f"[green]Yes. The last release was on {datetime.strftime(test_date, '%m-%d-%Y')} which was {days} days ago"
     assert actual == expected
 
 
-def test_release_in_last_year_no(monkeypatch):
+def test_release_in_last_year_no():
     """
     12. Has there been a release in the last year?
     """
 
-    def mock_get(*args, **kwargs):
-        return MockResponseReleasesNo()
-
     today = datetime.now()
     test_date = datetime.strptime(BAD_DATE, "%Y-%m-%dT%H:%M:%S")
     days = (today - test_date).days
 
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
-    url = "https://fakeurl"
-    actual = release_in_last_year(url)
+    actual = release_in_last_year(MockResponseReleasesNo.json())
     expected = f"[red]No. Version 1.1.1 was last released {days} days ago"
     assert actual == expected
 
 
-def test_production_ready_check_yes(monkeypatch):
+def test_production_ready_check_yes():
     """
     1. Is it described as 'production ready'?
     """
 
-    def mock_get(*args, **kwargs):
-        return MockResponseProductionReadyYes()
-
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
-    url = "https://fakeurl"
-    actual = production_ready_check(url)
+    actual = production_ready_check(MockResponseProductionReadyYes.json())
     expected = "[green]The project is set to Development Status [underline]Alpha"
     assert actual == expected
 
 
-def test_production_ready_check_no(monkeypatch):
+def test_production_ready_check_no():
     """
     1. Is it described as 'production ready'?
     """
 
-    def mock_get(*args, **kwargs):
-        return MockResponseProductionReadyNo()
-
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
-    url = "https://fakeurl"
-    actual = production_ready_check(url)
+    actual = production_ready_check(MockResponseProductionReadyNo.json())
     expected = "[red]There is no Development Status for this package. It is currently at version 0.5"
     assert actual == expected
 
 
-def test_document_exists_yes(monkeypatch):
+def test_document_exists_yes():
     """
     2. Is there sufficient documentation?
     """
 
-    def mock_get(*args, **kwargs):
-        return MockResponseDocumentationYes()
-
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
-    url = "https://fakeurl"
-    actual = documentation_exists(url)
+    actual = documentation_exists(MockResponseDocumentationYes.json())
     expected = "[green]Documentation can be found at https://fakeurl/blob/main/README.md"
     assert actual == expected
 
 
-def test_document_exists_no(monkeypatch):
+def test_document_exists_no():
     """
     2. Is there sufficient documentation?
     """
 
-    def mock_get(*args, **kwargs):
-        return MockResponseDocumentationNo()
-
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
-    url = "https://fakeurl"
-    actual = documentation_exists(url)
+    actual = documentation_exists(MockResponseDocumentationNo.json())
     expected = "[red]There is no documentation for this project"
     assert actual == expected
 
 
-def test_language_check(monkeypatch):
+def test_language_check():
     """
     6. Are the tests running with the latest Language version?
     """
 
-    def mock_get(*args, **kwargs):
-        return MockResponseLanguageCheck()
-
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
-    url = "https://fakeurl"
-    actual = language_check(url)
+    actual = language_check(MockResponseLanguageCheck.json())
     expected = "[green]The project supports the following programming languages\n- Python 3.6\n- Python 3.7\n"
     assert actual == expected
 
 
-def test_framework_check_exists(monkeypatch):
+def test_framework_check_exists():
     """
     7. Are the tests running with the latest Integration version?
     """
 
-    def mock_get(*args, **kwargs):
-        return MockResponseFrameworkCheck()
-
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
-    url = "https://fakeurl"
-    actual = framework_check(url)
+    actual = framework_check(MockResponseFrameworkCheck.json())
     expected = "[green]The project supports the following framework as it's latest[bold] Framework Django 3.2"
     assert actual == expected
 
 
-def test_framework_check_does_not_exist(monkeypatch):
+def test_framework_check_does_not_exist():
     """
     7. Are the tests running with the latest Integration version?
     """
 
-    def mock_get(*args, **kwargs):
-        return MockResponseLanguageCheck()
-
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
-    url = "https://fakeurl"
-    actual = framework_check(url)
+    actual = framework_check(MockResponseLanguageCheck.json())
     expected = "[green]This project has no associated frameworks"
     assert actual == expected
 
@@ -652,8 +710,8 @@ cnQhWy9ib2xkIHJlZF1cbiIK
         """
         return content
 
-    # # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
+    # # apply the monkeypatch for requests.Session.get to mock_get
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     monkeypatch.setattr("the_well_maintained_test.utils._get_content", mock__get_content)
     url = "https://fakeurl"
     actual = check_tests(url, headers=headers, show_progress=True)
@@ -661,6 +719,33 @@ cnQhWy9ib2xkIHJlZF1cbiIK
     assert actual == expected
 
 
+@pytest.mark.parametrize("workers", [1, 4])
+def test_check_tests_fetches_files_concurrently(monkeypatch, workers):
+    class MockTree:
+        @staticmethod
+        def raise_for_status():
+            pass
+
+        @staticmethod
+        def json():
+            return {"tree": [{"type": "blob", "path": f"tests/test_{i}.py", "url": str(i)} for i in range(5)]}
+
+    threads = set()
+
+    def mock__get_content(url, headers):
+        threads.add(threading.get_ident())
+        # Make the first files the slowest ones to finish
+        sleep(0.01 * (5 - int(url)))
+        return base64.b64encode(b"def test_a(): ...\n" * int(url))
+
+    monkeypatch.setattr(requests.Session, "get", lambda *args, **kwargs: MockTree())
+    monkeypatch.setattr("the_well_maintained_test.utils._get_content", mock__get_content)
+    actual = check_tests("https://fakeurl", {}, show_progress=False, workers=workers)
+    expected = "[green]There are 10 tests in 5 files:\n" + "".join(f"- tests/test_{i}.py\n" for i in range(5))
+    assert actual == expected
+    assert len(threads) == workers
+
+
 def test_check_tests_do_not_exist(monkeypatch):
     """
     5. Are there sufficient tests?
@@ -670,20 +755,121 @@ def test_check_tests_do_not_exist(monkeypatch):
     def mock_get(*args, **kwargs):
         return MockGitHubFileCheckAPIWithOutTestFiles()
 
-    # apply the monkeypatch for requests.get to mock_get
-    monkeypatch.setattr(requests, "get", mock_get)
+    # apply the monkeypatch for requests.Session.get to mock_get
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     url = "https://fakeurl"
     actual = check_tests(url, headers=headers, show_progress=True)
     expected = "[red]There are 0 tests!"
     assert actual == expected
 
 
+class MockResponseArchive:
+    def __init__(self, files, status_code=200):
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+            for path, source in files.items():
+                info = tarfile.TarInfo(f"django-django-98352dd/{path}")
+                info.size = len(source)
+                archive.addfile(info, io.BytesIO(source))
+        buffer.seek(0)
+        self.raw = buffer
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code != 200:
+            raise requests.HTTPError(f"{self.status_code} Not Found")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.raw.close()
+
+
+ARCHIVE_FILES = {
+    "README.rst": b"def test_not_a_test_file(): ...\n",
+    "tests/test_views.py": b"def test_index():\n    pass\n\n\ndef test_detail():\n    pass\n",
+    "app/tests.py": b"class Tests:\n    def test_model(self):\n        pass\n",
+}
+
+
+def test__get_archive_test_files(monkeypatch):
+    calls = []
+
+    def mock_get(self, url, headers=None, **kwargs):
+        calls.append((url, kwargs.get("stream")))
+        return MockResponseArchive(ARCHIVE_FILES)
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    actual = _get_archive_test_files("https://fakeurl/tarball/main", {})
+    assert actual == [{"path": "tests/test_views.py", "test_count": 2}, {"path": "app/tests.py", "test_count": 1}]
+    assert calls == [("https://fakeurl/tarball/main", True)]
+
+
+def test__get_archive_test_files_not_found(monkeypatch):
+    monkeypatch.setattr(requests.Session, "get", lambda *args, **kwargs: MockResponseArchive({}, 404))
+    with pytest.raises(requests.HTTPError):
+        _get_archive_test_files("https://fakeurl/tarball/main", {})
+
+
+def test_check_tests_from_archive(monkeypatch):
+    def mock_get(self, url, headers=None, **kwargs):
+        assert url == "https://fakeurl/tarball/main"
+        return MockResponseArchive(ARCHIVE_FILES)
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    actual = check_tests("https://fakeurl/git/trees/main", {}, show_progress=False, archive_url="https://fakeurl/tarball/main")
+    assert actual == "[green]There are 3 tests in 2 files:\n- tests/test_views.py\n- app/tests.py\n"
+    assert check_tests("", {}, archive_url="https://fakeurl/tarball/main") == actual
+    monkeypatch.setattr(requests.Session, "get", lambda *args, **kwargs: MockResponseArchive({"README.rst": b""}))
+    assert check_tests("", {}, archive_url="https://fakeurl/tarball/main") == "[red]There are 0 tests!"
+
+
+def test_check_tests_falls_back_without_archive(monkeypatch):
+    github_document = FakeServices.github_document
+
+    def without_tarball(self, name, path):
+        return (None, None) if path.startswith("/tarball/") else github_document(self, name, path)
+
+    monkeypatch.setattr(client, "_rate_limiter", RateLimiter())
+    monkeypatch.setattr(FakeServices, "github_document", without_tarball)
+    with FakeServices({"demo": 2}) as services, services.use():
+        report = evaluate_report("demo", {}, archive=True)
+        assert report.answers["5"].startswith("[green]There are 10 tests in 2 files:")
+        assert services.requests["not-found"] == 1
+        assert services.requests["github-blob"] == 2
+
+
+def test_failed_checks_are_reported_and_not_cached(monkeypatch, tmp_path):
+    github_document = FakeServices.github_document
+
+    def without_workflows(self, name, path):
+        return (None, None) if path == "/actions/workflows" else github_document(self, name, path)
+
+    monkeypatch.setattr(client, "_rate_limiter", RateLimiter())
+    monkeypatch.setattr(FakeServices, "github_document", without_workflows)
+    cache = ResultCache(tmp_path / "results.sqlite")
+    set_result_cache(cache)
+    try:
+        with FakeServices({"demo": 2}) as services, services.use():
+            report = evaluate_report("demo", {}, workers=1)
+            assert report.answers is None
+            assert report.error.startswith("404 Client Error")
+            with pytest.raises(requests.HTTPError):
+                ci_setup("https://api.github.com/repos/fake/demo/actions/workflows", {})
+        answers = cache.get_answers("demo", "1.0.0")
+        assert "8" not in answers
+        assert answers["1"].startswith("[green]The project is set to Development Status")
+    finally:
+        set_result_cache(None)
+
+
 def test__get_content_base64(monkeypatch):
     def mock_get(*args, **kwargs):
         return MockResponseContentBase64()
 
     headers = {}
-    monkeypatch.setattr(requests, "get", mock_get)
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     url = "https://fakeurl"
     actual = _get_content(url, headers)
     expected = "test"
@@ -695,7 +881,7 @@ def test__get_content_not_base64(monkeypatch):
         return MockResponseContentNotBase64()
 
     headers = {}
-    monkeypatch.setattr(requests, "get", mock_get)
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     url = "https://fakeurl"
     with pytest.raises(TypeError):
         _get_content(url, headers)
@@ -766,12 +952,69 @@ cnQhWy9ib2xkIHJlZF1cbiIK
     assert actual == expected
 
 
+def test__source_test_method_count():
+    source = b"""
+import unittest
+from test_helpers import test_data  # test_ in an import and a comment
+
+def test_function():
+    assert test_data
+
+
+async def test_coroutine():
+    pass
+
+
+def helper_test_():
+    pass
+
+
+class TestClass:
+    def test_method(self):
+        pass
+
+    def setup_method(self):
+        pass
+
+    class TestNested:
+        def test_nested(self):
+            pass
+
+
+class Checks(unittest.TestCase):
+    def test_one(self):
+        pass
+
+    def testTwo(self):
+        pass
+
+
+class Helpers:
+    def test_not_collected(self):
+        pass
+"""
+    assert _source_test_method_count(source) == 6
+
+
+def test__source_test_method_count_unparsable():
+    source = b"""
+class Tests(TestCase):
+    def test_print(self):
+        print "test_"
+
+    def test_other(self):
+        pass
+"""
+    assert _source_test_method_count(source) == 2
+    assert _source_test_method_count(b"def test_a():\n    (\ndef test_b():\n") == 2
+
+
 def test__get_test_files_exist(monkeypatch):
     def mock_get(*args, **kwargs):
         return MockResponseTestFilesExist()
 
     headers = {}
-    monkeypatch.setattr(requests, "get", mock_get)
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     url = "https://fakeurl"
     actual = _get_test_files(url, headers)
     expected = [
@@ -792,7 +1035,7 @@ def test__get_test_files_do_not_exist(monkeypatch):
         return MockResponseTestFilesDoNotExist()
 
     headers = {}
-    monkeypatch.setattr(requests, "get", mock_get)
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     url = "https://fakeurl"
     actual = _get_test_files(url, headers)
     expected = []
@@ -804,7 +1047,7 @@ def test__get_test_files_no_blobs(monkeypatch):
         return MockResponseTestFilesNoBlobs()
 
     headers = {}
-    monkeypatch.setattr(requests, "get", mock_get)
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     url = "https://fakeurl"
     actual = _get_test_files(url, headers)
     expected = []
@@ -847,21 +1090,6 @@ def test__get_release_date_missing():
     assert actual == expected
 
 
-def test__get_requirements_txt_file(tmpdir, monkeypatch):
-    def mock_get(*args, **kwargs):
-        return MockResponseProjectURLs()
-
-    monkeypatch.setattr(requests, "get", mock_get)
-
-    p = tmpdir.mkdir("sub").join("requirements.txt")
-    p.write("Django==3.2.9")
-    actual = _get_requirements_txt_file(p)
-    expected = [
-        ("Django", "https://github.com/django/django"),
-    ]
-    assert actual == expected
-
-
 def test_get_github_api_rate_limits(monkeypatch):
     def mock_get(*args, **kwargs):
         return MockResponseGitHubRateLimit()
@@ -869,7 +1097,7 @@ def test_get_github_api_rate_limits(monkeypatch):
     resource = "core"
     headers = {}
 
-    monkeypatch.setattr(requests, "get", mock_get)
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     reset_date = strftime("%Y-%m-%d %H:%M:%S", localtime(1372700873))
     actual = get_github_api_rate_limits(headers, resource)
     message = "You have used 1 out of 5000 calls.\n\n"
@@ -880,24 +1108,14 @@ def test_get_github_api_rate_limits(monkeypatch):
     assert actual == expected
 
 
-def test_get_vulnerabilities_yes(monkeypatch):
-    def mock_get(*args, **kwargs):
-        return MockResponseWithVulnerabilities()
-
-    monkeypatch.setattr(requests, "get", mock_get)
-    url = "https://fakeurl"
-    actual = get_vulnerabilities(url)
+def test_get_vulnerabilities_yes():
+    actual = get_vulnerabilities(MockResponseWithVulnerabilities.json())
     expected = 3
     assert actual == expected
 
 
-def test_get_vulnerabilities_no(monkeypatch):
-    def mock_get(*args, **kwargs):
-        return MockResponseWithoutVulnerabilities()
-
-    monkeypatch.setattr(requests, "get", mock_get)
-    url = "https://fakeurl"
-    actual = get_vulnerabilities(url)
+def test_get_vulnerabilities_no():
+    actual = get_vulnerabilities(MockResponseWithoutVulnerabilities.json())
     expected = 0
     assert actual == expected
 
@@ -906,8 +1124,1106 @@ def test__get_package_github_url_non_github_homepage(monkeypatch):
     def mock_get(*args, **kwargs):
         return MockResponseNonGitHubHomePage()
 
-    monkeypatch.setattr(requests, "get", mock_get)
+    monkeypatch.setattr(requests.Session, "get", mock_get)
     url = "https://fakeurl"
     actual = _get_package_github_url(url)[1]
     expected = "https://www.github.com/author/package"
     assert actual == expected
+
+
+def test__get_package_snapshot(monkeypatch):
+    calls = []
+
+    def mock_get(*args, **kwargs):
+        calls.append(args[1:])
+        return MockResponseProductionReadyNo()
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    actual = _get_package_snapshot("package")
+    assert actual.name == "package"
+    assert actual.version == "0.5"
+    assert actual.pypi_data == MockResponseProductionReadyNo.json()
+    assert calls == [("https://pypi.org/pypi/package/json",)]
+
+
+def test__get_package_github_url_reuses_pypi_data(monkeypatch):
+    def mock_get(*args, **kwargs):  # pragma: no cover
+        raise AssertionError("PyPI should not be called again")
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    actual = _get_package_github_url("Django", MockResponseProjectURLs.json())
+    expected = ("Django", "https://github.com/django/django")
+    assert actual == expected
+
+
+def test_client_get_uses_shared_session_and_default_timeout(monkeypatch):
+    calls = []
+
+    def mock_get(self, url, **kwargs):
+        calls.append((self, url, kwargs))
+        return MockResponseCIPassing()
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    client.get("https://fakeurl", headers={"Authorization": "token abc"})
+    client.get("https://fakeurl", timeout=5)
+    assert calls[0][0] is calls[1][0]
+    assert calls[0][2] == {"headers": {"Authorization": "token abc"}, "timeout": client.DEFAULT_TIMEOUT}
+    assert calls[1][2] == {"headers": None, "timeout": 5}
+
+
+def test_client_configure_pool_sizes_and_timeout(monkeypatch):
+    monkeypatch.setattr(client, "_pool_sizes", dict(client.POOL_SIZES))
+    monkeypatch.setattr(client, "_timeout", client.DEFAULT_TIMEOUT)
+    session = client.get_session()
+    client.configure(timeout=3, pool_sizes={"https://api.github.com": 50})
+    new_session = client.get_session()
+    assert new_session is not session
+    assert client._timeout == 3
+    assert new_session.get_adapter("https://api.github.com/repos")._pool_maxsize == 50
+    assert new_session.get_adapter("https://pypi.org/pypi")._pool_maxsize == client.POOL_SIZES["https://pypi.org"]
+    assert new_session.get_adapter("https://example.com")._pool_maxsize == client.DEFAULT_POOL_SIZE
+    client.configure()
+    assert client._timeout == 3
+
+
+def test__get_repo_urls():
+    actual = _get_repo_urls("author", "package", "main")
+    expected = {
+        "api_url": "https://api.github.com/repos/author/package",
+        "commits_url": "https://api.github.com/repos/author/package/commits/main",
+        "workflows_url": "https://api.github.com/repos/author/package/actions/workflows",
+        "ci_status_url": "https://api.github.com/repos/author/package/actions/runs",
+        "bugs_url": "https://api.github.com/repos/author/package/issues?labels=bug&per_page=100",
+        "tree_url": "https://api.github.com/repos/author/package/git/trees/main?recursive=1",
+        "tarball_url": "https://api.github.com/repos/author/package/tarball/main",
+    }
+    assert actual == expected
+
+
+@pytest.mark.parametrize("workers", [1, 6])
+def test_evaluate_package_yields_answers_in_question_order(monkeypatch, workers):
+    threads = {}
+
+    def mock_check(name):
+        def check(*args):
+            threads[name] = threading.get_ident()
+            # Make the early GitHub questions the slowest ones to finish
+            sleep(0.05 if name == "bug_responding" else 0)
+            return f"{name}{args}"
+
+        return check
+
+    for name in [
+        "production_ready_check",
+        "documentation_exists",
+        "change_log_check",
+        "bug_responding",
+        "check_tests",
+        "language_check",
+        "framework_check",
+        "ci_setup",
+        "ci_passing",
+        "well_used",
+        "commit_in_last_year",
+        "release_in_last_year",
+    ]:
+        monkeypatch.setattr(f"the_well_maintained_test.evaluate.{name}", mock_check(name))
+
+    urls = _get_repo_urls("author", "package", "main")
+    actual = list(evaluate_package({}, urls, {}, show_progress=False, workers=workers))
+    assert [question for question, _ in actual] == [str(i) for i in range(1, 13)]
+    archived = dict(evaluate_package({}, urls, {}, show_progress=False, workers=workers, archive=True))
+    assert archived["5"] == f"check_tests{(urls['tree_url'], {}, False, urls['tarball_url'], workers)}"
+    assert actual[0] == ("1", "production_ready_check({},)")
+    assert actual[4] == ("5", f"check_tests{(urls['tree_url'], {}, False, None, workers)}")
+    assert actual[9] == ("10", f"well_used{(urls['api_url'], {})}")
+    main_thread = threading.get_ident()
+    github_threads = {threads[name] for name in ["bug_responding", "check_tests", "ci_setup", "ci_passing", "well_used"]}
+    if workers == 1:
+        assert github_threads == {main_thread}
+    else:
+        assert main_thread not in github_threads
+
+
+def test_result_cache_expiry(monkeypatch, tmp_path):
+    now = [1000]
+    monkeypatch.setattr("the_well_maintained_test.cache.time.time", lambda: now[0])
+    cache = ResultCache(tmp_path / "results.sqlite", ttls={"1": None, "9": 60})
+    cache.set("django", "3.2.9", "1", "[green]Yes")
+    cache.set("django", "3.2.9", "9", "[red]No")
+    assert cache.get_answers("django", "3.2.9") == {"1": "[green]Yes", "9": "[red]No"}
+    assert cache.get_answers("django", "4.0") == {}
+    now[0] = 1100
+    assert cache.get_answers("django", "3.2.9") == {"1": "[green]Yes"}
+    cache.max_age = 50
+    assert cache.get_answers("django", "3.2.9") == {}
+    cache.max_age = None
+    cache.refresh = True
+    assert cache.get_answers("django", "3.2.9") == {}
+    cache.close()
+
+
+def test_result_cache_keeps_answer_data(tmp_path):
+    cache = ResultCache(tmp_path / "results.sqlite")
+    cache.set("django", "3.2.9", "9", Answer("[green]Yes", passing=True, conclusion="success"))
+    cache.set("django", "3.2.9", "2", "[red]No")
+    answers = cache.get_answers("django", "3.2.9")
+    assert answers == {"9": "[green]Yes", "2": "[red]No"}
+    assert answers["9"].data == {"passing": True, "conclusion": "success"}
+    assert answers["2"].data == {}
+    cache.close()
+
+
+def test_result_cache_change_markers(monkeypatch, tmp_path):
+    now = [1000]
+    monkeypatch.setattr("the_well_maintained_test.cache.time.time", lambda: now[0])
+    cache = ResultCache(tmp_path / "results.sqlite", ttls={"5": 60, "10": 60})
+    cache.set("django", "3.2.9", "5", "tests", "tree-a")
+    cache.set("django", "3.2.9", "10", "stats")
+    now[0] = 5000
+    assert cache.get_answers("django", "3.2.9", {"tree": "tree-a", "head": "abc"}) == {"5": "tests"}
+    assert cache.get_answers("django", "3.2.9", {"tree": "tree-b"}) == {}
+    assert cache.get_answers("django", "3.2.9") == {}
+    now[0] = 1010
+    assert cache.get_answers("django", "3.2.9", {"tree": "tree-b"}) == {"10": "stats"}
+    assert cache.get_answers("django", "3.2.9") == {"5": "tests", "10": "stats"}
+    # --max-age still applies to answers whose marker hasn't changed
+    cache.max_age = 5
+    now[0] = 5000
+    assert cache.get_answers("django", "3.2.9", {"tree": "tree-a"}) == {}
+    cache.close()
+
+
+def test__get_markers(monkeypatch):
+    documents = {
+        "https://fakeurl/commits/main": {"sha": "abc", "commit": {"tree": {"sha": "def"}}},
+        "https://fakeurl/actions/runs": {"workflow_runs": [{"id": 42, "conclusion": None}, {"id": 41}]},
+    }
+
+    class MockDocument:
+        def __init__(self, url):
+            self.url = url
+
+        def json(self):
+            return documents[self.url]
+
+    monkeypatch.setattr(requests.Session, "get", lambda self, url, **kwargs: MockDocument(url))
+    urls = {"commits_url": "https://fakeurl/commits/main", "ci_status_url": "https://fakeurl/actions/runs"}
+    assert _get_markers(urls, {}) == {"head": "abc", "tree": "def", "run": "42:None"}
+    assert _get_markers({}, {}) == {}
+    # The run finishing changes the marker, so an answer stored while it was running isn't reused
+    documents["https://fakeurl/actions/runs"]["workflow_runs"][0]["conclusion"] = "success"
+    assert _get_markers(urls, {})["run"] == "42:success"
+    documents["https://fakeurl/commits/main"] = {"commit": {"author": {"date": "2021-06-12T00:00:00Z"}}}
+    documents["https://fakeurl/actions/runs"] = {"workflow_runs": []}
+    assert _get_markers(urls, {}) == {}
+
+    def mock_get(*args, **kwargs):
+        raise requests.ConnectionError
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    assert _get_markers(urls, {}) == {}
+
+
+@pytest.mark.parametrize("workers", [1, 6])
+def test_evaluate_package_reuses_cached_answers(monkeypatch, tmp_path, workers):
+    called = []
+
+    def mock_check(name):
+        def check(*args):
+            called.append(name)
+            return name
+
+        return check
+
+    monkeypatch.setattr(
+        "the_well_maintained_test.evaluate._get_question_calls",
+        lambda *args: {
+            "1": (mock_check("production_ready_check"), ()),
+            "5": (mock_check("check_tests"), ()),
+            "9": (mock_check("ci_passing"), ()),
+            "10": (mock_check("well_used"), ()),
+        },
+    )
+    cache = ResultCache(tmp_path / "results.sqlite")
+    cache.set("django", "3.2.9", "5", "cached check_tests")
+    cache.set("django", "3.2.8", "9", "old ci_passing")
+    set_result_cache(cache)
+    try:
+        pypi_data = {"info": {"name": "Django", "version": "3.2.9"}}
+        actual = list(evaluate_package(pypi_data, {}, {}, show_progress=False, workers=workers))
+        assert actual == [("1", "production_ready_check"), ("5", "cached check_tests"), ("9", "ci_passing"), ("10", "well_used")]
+        assert sorted(called) == ["ci_passing", "production_ready_check", "well_used"]
+        assert cache.get_answers("django", "3.2.9")["10"] == "well_used"
+        assert list(evaluate_package({}, {}, {}, workers=workers))[1] == ("5", "check_tests")
+
+        called.clear()
+        cache.set("django", "3.2.9", "9", "cached ci_passing", "41")
+        monkeypatch.setattr("the_well_maintained_test.evaluate._get_markers", lambda urls, headers: {"run": "42"})
+        actual = dict(evaluate_package(pypi_data, {}, {}, show_progress=False, workers=workers))
+        assert actual["9"] == "ci_passing"
+        assert "ci_passing" in called
+        called.clear()
+        actual = dict(evaluate_package(pypi_data, {}, {}, show_progress=False, workers=workers))
+        assert actual["9"] == "ci_passing"
+        assert called == []
+    finally:
+        set_result_cache(None)
+
+
+def test__get_headers(tmp_path):
+    auth = tmp_path / "auth.json"
+    assert _get_headers(str(auth)) == {}
+    auth.write_text('{"github_personal_token": "abc"}')
+    assert _get_headers(str(auth)) == {"Authorization": "token abc"}
+    assert _get_headers(str(auth), "xyz") == {"Authorization": "token xyz"}
+
+
+def test__get_tokens(tmp_path):
+    auth = tmp_path / "auth.json"
+    assert _get_tokens(str(auth)) == []
+    auth.write_text('{"github_personal_token": "abc", "github_personal_tokens": ["abc", "def", "ghi"]}')
+    assert _get_tokens(str(auth)) == ["abc", "def", "ghi"]
+    assert _get_tokens(str(auth), "xyz") == ["xyz"]
+    assert _get_headers(str(auth)) == {"Authorization": "token abc"}
+    auth.write_text('{"github_personal_tokens": ["def", "ghi"]}')
+    assert _get_headers(str(auth)) == {"Authorization": "token def"}
+
+
+def test__get_questions():
+    questions = _get_questions()
+    assert list(questions.get("question")) == [str(i) for i in range(1, 13)]
+    assert questions.get("question").get("5").get("question_function") == "check_tests"
+
+
+def test_compiled_data_matches_toml():
+    data_dir = Path(__file__).parent.parent / "src" / "the_well_maintained_test" / "data"
+    # Run compile-data.py after editing the TOML files
+    assert _get_questions() == toml.loads((data_dir / "questions.toml").read_text())
+    assert _get_urls() == toml.loads((data_dir / "urls.toml").read_text())
+
+
+def test_cli_imports_stay_light():
+    code = "import sys; from the_well_maintained_test import cli; print(sorted({'requests', 'rich'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_questions_lists_every_question():
+    runner = CliRunner()
+    result = runner.invoke(cli, ["questions"])
+    assert result.exit_code == 0
+    assert result.output.splitlines() == [v["question_text"] for v in _get_questions()["question"].values()]
+
+
+def test__get_requirements_txt_packages(tmp_path):
+    p = tmp_path / "requirements.txt"
+    p.write_text("Django==3.2.9\nrich\n")
+    assert _get_requirements_txt_packages(p) == ["Django", "rich"]
+
+
+def test__get_requirements_txt_packages_pip_compile(tmp_path):
+    (tmp_path / "base.txt").write_text("requests[socks]>=2.0  # via -r requirements.in\n-r requirements.txt\n")
+    p = tmp_path / "requirements.txt"
+    p.write_text(
+        "# This file is autogenerated by pip-compile\n"
+        "--index-url https://pypi.org/simple\n"
+        "-r base.txt\n"
+        "-c constraints.txt\n"
+        "django==4.2 \\\n"
+        "    --hash=sha256:abc \\\n"
+        "    --hash=sha256:def\n"
+        "    # via -r requirements.in\n"
+        "Django_Extensions ; python_version >= '3.8'\n"
+        "django-extensions==3.2\n"
+        "pkg @ https://example.com/pkg.tar.gz\n"
+        "https://example.com/other.tar.gz\n"
+        "-e .\n"
+        "./local/path\n"
+    )
+    assert _get_requirements_txt_packages(p) == ["requests", "django", "Django_Extensions", "pkg"]
+
+
+def test_get_packages_from_lock_files(tmp_path):
+    uv_lock = tmp_path / "uv.lock"
+    uv_lock.write_text(
+        "version = 1\n"
+        '[[package]]\nname = "my-project"\nversion = "0.1.0"\nsource = { editable = "." }\n'
+        'dependencies = [{ name = "Rich" }]\n'
+        '[[package]]\nname = "Rich"\nversion = "13.0"\nsource = { registry = "https://pypi.org/simple" }\n'
+        '[[package]]\nname = "typing_extensions"\nversion = "4.0"\nsource = { registry = "https://pypi.org/simple" }\n'
+    )
+    assert get_packages(uv_lock) == ["rich", "typing-extensions"]
+
+    poetry_lock = tmp_path / "poetry.lock"
+    poetry_lock.write_text(
+        '[[package]]\nname = "click"\nversion = "8.0"\n'
+        '[[package]]\nname = "local-lib"\nversion = "0.1"\n[package.source]\ntype = "directory"\nurl = "../lib"\n'
+    )
+    assert get_packages(poetry_lock) == ["click"]
+
+    # Rye writes pip requirements to requirements.lock
+    rye_lock = tmp_path / "requirements-dev.lock"
+    rye_lock.write_text("# generated by rye\n-e file:.\nclick==8.1.7\n    # via my-project\n")
+    assert get_packages(rye_lock) == ["click"]
+
+
+def test_get_packages_from_pyproject(tmp_path):
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text(
+        "[project]\n"
+        'dependencies = ["click>=8", "Rich[jupyter]; python_version > \'3.9\'"]\n'
+        "[project.optional-dependencies]\n"
+        'test = ["pytest", "click"]\n'
+        "[dependency-groups]\n"
+        'dev = ["ruff", {include-group = "test"}]\n'
+        "[tool.poetry.dependencies]\n"
+        'python = "^3.10"\n'
+        '"Zope.Interface" = "*"\n'
+        "[tool.poetry.group.docs.dependencies]\n"
+        'mkdocs = "*"\n'
+    )
+    assert get_packages(pyproject) == ["click", "rich", "pytest", "ruff", "zope-interface", "mkdocs"]
+
+
+def test__get_package_github_url_without_github():
+    pypi_data = {"info": {"project_urls": {"Homepage": "https://www.package.com"}}}
+    assert _get_package_github_url("package", pypi_data) == ("package", None)
+
+
+def test__get_package_urls(monkeypatch):
+    calls = []
+
+    def mock_get(*args, **kwargs):
+        calls.append(args[1])
+        return MockResponseDefaultBranch()
+
+    class MockResponseDefaultBranch:
+        status_code = 200
+        headers = {}
+
+        @staticmethod
+        def json():
+            return {"default_branch": "trunk"}
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    PackageSnapshot = namedtuple("PackageSnapshot", ["name", "version", "pypi_data"])
+    snapshot = PackageSnapshot("Django", "3.2.9", MockResponseProjectURLs.json())
+    assert _get_package_urls(snapshot, {}) == _get_repo_urls("django", "django", "trunk")
+    assert calls == ["https://api.github.com/repos/django/django"]
+    assert _get_package_urls(snapshot, {}, "main") == _get_repo_urls("django", "django", "main")
+    assert len(calls) == 1
+    monkeypatch.setattr(
+        "the_well_maintained_test.evaluate._get_package_github_url",
+        lambda name, pypi_data: (name, "https://github.com/django/django/"),
+    )
+    assert _get_package_urls(snapshot, {}, "main") == _get_repo_urls("django", "django", "main")
+
+
+def test_evaluate_report(monkeypatch):
+    class MockResponsePackage:
+        @staticmethod
+        def json():
+            return {"info": {"version": "1.0"}, **MockResponseWithVulnerabilities.json()}
+
+    def mock_get(*args, **kwargs):
+        return MockResponsePackage()
+
+    def mock_evaluate_package(pypi_data, urls, headers, show_progress, workers, archive, memo):
+        yield "1", "answer"
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    monkeypatch.setattr("the_well_maintained_test.evaluate._get_package_urls", lambda snapshot, headers, memo=None: {})
+    monkeypatch.setattr("the_well_maintained_test.evaluate.evaluate_package", mock_evaluate_package)
+    actual = evaluate_report("package", {})
+    assert actual == PackageReport("package", 3, {"1": "answer"}, version="1.0")
+
+
+def test_evaluate_report_without_github(monkeypatch):
+    def mock_get(*args, **kwargs):
+        return MockResponseDocumentationNo()
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    actual = evaluate_report("package", {})
+    assert actual == PackageReport("package", 0, None)
+
+
+def test_evaluate_report_network_error(monkeypatch):
+    def mock_get(*args, **kwargs):
+        raise requests.ConnectionError("Failed to resolve 'pypi.org'")
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    actual = evaluate_report("package", {})
+    assert actual == PackageReport("package", 0, None, "Failed to resolve 'pypi.org'")
+
+
+def test_evaluate_requirements_keeps_package_order(monkeypatch):
+    def mock_evaluate_report(package, headers, show_progress, workers, snapshot=None, archive=False, memo=None):
+        sleep(0.05 if package == "a" else 0)
+        return PackageReport(package, 0, {"progress": show_progress})
+
+    monkeypatch.setattr("the_well_maintained_test.evaluate.evaluate_report", mock_evaluate_report)
+    actual = list(evaluate_requirements(["a", "b", "c"], {}, jobs=3))
+    assert [report.name for report in actual] == ["a", "b", "c"]
+    assert actual[0].answers == {"progress": False}
+    assert list(evaluate_requirements(["a"], {}))[0].answers == {"progress": True}
+    assert list(evaluate_requirements(["a"], {}, show_progress=False))[0].answers == {"progress": False}
+
+
+def test_evaluate_async(monkeypatch):
+    monkeypatch.setattr(client, "_rate_limiter", RateLimiter())
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def mock_get_content(url, headers):
+        assert threading.current_thread().name.startswith("evaluate-async")
+        with lock:
+            running.append(url)
+            peak.append(len(running))
+        sleep(0.02)
+        with lock:
+            running.remove(url)
+        return _get_content(url, headers)
+
+    monkeypatch.setattr("the_well_maintained_test.evaluate._get_content", mock_get_content)
+    set_async_concurrency(3)
+    try:
+        with FakeServices({"a": 6, "b": 2, "c": 0}, tests_per_file=2, bugs=4) as services, services.use():
+            expected = [evaluate_report(package, {}) for package in ["a", "b", "c"]]
+            actual = asyncio.run(evaluate_requirements_async(["a", "b", "c"], {}))
+            assert actual == expected
+            # The test files of every package are fetched at the same time, up to the limit
+            assert max(peak) == 3
+            assert len(peak) == 8
+
+            peak.clear()
+            archive = asyncio.run(evaluate_async("a", {}, archive=True))
+            assert archive.answers == expected[0].answers
+            assert peak == []
+            assert asyncio.run(evaluate_async("missing", {})) == evaluate_report("missing", {})
+    finally:
+        set_async_concurrency(DEFAULT_ASYNC_CONCURRENCY)
+
+
+def test_evaluate_report_with_one_worker_opens_no_pools(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("a thread pool was opened")
+
+    monkeypatch.setattr(client, "_rate_limiter", RateLimiter())
+    monkeypatch.setattr("the_well_maintained_test.utils.ThreadPoolExecutor", no_pool)
+    monkeypatch.setattr("the_well_maintained_test.evaluate.ThreadPoolExecutor", no_pool)
+    with FakeServices({"demo": 3}, bugs=4) as services, services.use():
+        report = evaluate_report("demo", {}, workers=1)
+    assert report.answers["4"].startswith("[green]The maintainer responded to 4 of 4 open bugs")
+    assert report.answers["5"].startswith("[green]There are 15 tests in 3 files:")
+
+
+class MockCachingResponse:
+    def __init__(self, status_code, body=b"", headers=None):
+        self.status_code = status_code
+        self.content = body
+        self.text = body.decode()
+        self.headers = requests.structures.CaseInsensitiveDict(headers or {})
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error")
+
+    def close(self):
+        pass
+
+
+def test_client_backs_off_secondary_rate_limits(monkeypatch):
+    waits = []
+    responses = [
+        MockCachingResponse(403, b'{"message": "You have exceeded a secondary rate limit."}'),
+        MockCachingResponse(429, b"{}", {"Retry-After": "5"}),
+        MockCachingResponse(200, b'{"encoding": "base64"}'),
+    ]
+    monkeypatch.setattr(requests.Session, "get", lambda *args, **kwargs: responses.pop(0))
+    monkeypatch.setattr("the_well_maintained_test.client.sleep", waits.append)
+    monkeypatch.setattr(client, "_rate_limiter", RateLimiter())
+    url = "https://api.github.com/repos/django/django/git/blobs/abc"
+    assert client.get(url).json() == {"encoding": "base64"}
+    assert waits == [60, 5.0]
+
+    forbidden = MockCachingResponse(403, b'{"message": "Resource not accessible"}')
+    monkeypatch.setattr(requests.Session, "get", lambda *args, **kwargs: forbidden)
+    assert client.get(url) is forbidden
+    assert waits == [60, 5.0]
+
+    limited = MockCachingResponse(403, b'{"message": "secondary rate limit"}')
+    monkeypatch.setattr(requests.Session, "get", lambda *args, **kwargs: limited)
+    monkeypatch.setattr(client, "SECONDARY_RATE_LIMIT_RETRIES", 2)
+    assert client.get(url) is limited
+    assert waits == [60, 5.0, 60, 120]
+
+    # Only GitHub requests are retried
+    monkeypatch.setattr(requests.Session, "get", lambda *args, **kwargs: MockCachingResponse(429, b"{}", {"Retry-After": "5"}))
+    assert client.get("https://pypi.org/pypi/django/json").status_code == 429
+    assert waits == [60, 5.0, 60, 120]
+
+
+def test_checks_wait_out_secondary_rate_limits(monkeypatch):
+    waits = []
+    workflows_url = "https://api.github.com/repos/django/django/actions/workflows"
+    responses = [
+        MockCachingResponse(429, b'{"message": "slow down"}', {"Retry-After": "30"}),
+        MockCachingResponse(200, json.dumps({"total_count": 1, "workflows": [{"name": "Test"}]}).encode()),
+    ]
+
+    def mock_get(self, url, **kwargs):
+        assert url == workflows_url
+        return responses.pop(0)
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    monkeypatch.setattr("the_well_maintained_test.client.sleep", waits.append)
+    monkeypatch.setattr(client, "_rate_limiter", RateLimiter())
+    client.set_cache(None)
+    assert ci_setup(workflows_url, {}).startswith("[green]There is 1 workflows")
+    assert waits == [30.0]
+
+
+def test_rate_limiter_paces_requests(monkeypatch):
+    waits = []
+    monkeypatch.setattr("the_well_maintained_test.ratelimit.time.time", lambda: 1000)
+    monkeypatch.setattr("the_well_maintained_test.ratelimit.sleep", waits.append)
+    limiter = RateLimiter(max_wait=600)
+    url = "https://api.github.com/repos/django/django"
+    limiter.wait(url)
+    limiter.update(url, {"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "4000", "X-RateLimit-Reset": "1500"})
+    limiter.wait(url)
+    limiter.update(url, {"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "5", "X-RateLimit-Reset": "1500"})
+    limiter.wait(url)
+    # The next slot comes after the one already handed out, not after now
+    limiter.wait(url)
+    limiter.wait("https://api.github.com/graphql")
+    assert waits == [pytest.approx(500 / 6), pytest.approx(500 / 6 + 500 / 5)]
+    paced = waits[:]
+
+    limiter.update(url, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1300"})
+    assert limiter.is_exhausted(url)
+    limiter.wait(url)
+    assert waits == [*paced, 300]
+    limiter.update(url, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "2000"})
+    with pytest.raises(RateLimitExceeded):
+        limiter.wait(url)
+    limiter.update(url, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "900"})
+    assert not limiter.is_exhausted(url)
+    limiter.wait(url)
+    assert waits == [*paced, 300]
+
+    # The anonymous budget is smaller than the reserve, only running out waits
+    limiter.update(url, {"X-RateLimit-Limit": "60", "X-RateLimit-Remaining": "59", "X-RateLimit-Reset": "4600"})
+    limiter.wait(url)
+    limiter.update(url, {"X-RateLimit-Limit": "60", "X-RateLimit-Remaining": "1", "X-RateLimit-Reset": "4000"})
+    limiter.wait(url)
+    assert waits == [*paced, 300]
+
+    # The last request of a paced budget is made before the reset, not at it
+    limiter = RateLimiter()
+    limiter.update(url, {"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "1", "X-RateLimit-Reset": "4000"})
+    limiter.wait(url)
+    assert waits[-1] == 1500
+
+
+def test_anonymous_budget_isnt_paced(monkeypatch):
+    monkeypatch.setattr(client, "_rate_limiter", RateLimiter())
+    start = perf_counter()
+    with FakeServices({"demo": 3}, rate_limit=60) as services, services.use():
+        report = evaluate_report("demo", {})
+    assert report.answers["5"].startswith("[green]There are 15 tests in 3 files:")
+    assert services.requests["github-blob"] == 3
+    assert perf_counter() - start < 10
+
+
+def test_client_retries_after_rate_limit_reset(monkeypatch):
+    waits = []
+    responses = [
+        MockCachingResponse(200, b"{}", {"X-RateLimit-Remaining": "1", "X-RateLimit-Reset": "1060"}),
+        MockCachingResponse(403, b"{}", {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1060"}),
+        MockCachingResponse(200, b'{"default_branch": "main"}', {"X-RateLimit-Remaining": "4999", "X-RateLimit-Reset": "4600"}),
+    ]
+    monkeypatch.setattr(requests.Session, "get", lambda *args, **kwargs: responses.pop(0))
+    monkeypatch.setattr("the_well_maintained_test.ratelimit.time.time", lambda: 1000)
+    monkeypatch.setattr("the_well_maintained_test.ratelimit.sleep", waits.append)
+    monkeypatch.setattr(client, "_rate_limiter", RateLimiter(reserve=0))
+    url = "https://api.github.com/repos/django/django"
+    client.get(url)
+    assert client.get(url).json() == {"default_branch": "main"}
+    assert waits == [60]
+    assert responses == []
+
+    client.configure(rate_limit_wait=0)
+    client._rate_limiter.update(url, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1060"})
+    with pytest.raises(RateLimitExceeded):
+        client.get(url)
+    monkeypatch.setattr(requests.Session, "get", lambda *args, **kwargs: MockResponseCIPassing())
+    assert client.get("https://pypi.org/pypi/django/json").json() == MockResponseCIPassing.json()
+
+
+def test_client_rotates_tokens(monkeypatch):
+    sent = []
+    remaining = {"token abc": 50, "token def": 4000}
+
+    def mock_get(self, url, headers=None, **kwargs):
+        token = (headers or {}).get("Authorization")
+        sent.append((url, token))
+        if url.endswith("/rate_limit"):
+            rate_limit = {"resources": {"core": {"remaining": remaining[token], "reset": 4600}}}
+            return MockCachingResponse(200, json.dumps(rate_limit).encode())
+        remaining[token] = remaining.get(token, 60) - 1
+        return MockCachingResponse(200, b"{}", {"X-RateLimit-Remaining": str(remaining[token]), "X-RateLimit-Reset": "4600"})
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    monkeypatch.setattr("the_well_maintained_test.ratelimit.time.time", lambda: 1000)
+    monkeypatch.setattr(client, "_rate_limiter", RateLimiter(reserve=0))
+    try:
+        url = "https://api.github.com/repos/django/django"
+        client.set_tokens(["abc", "def"])
+        client.get(url, {"Authorization": "token abc"})
+        assert sent == [(url, "token abc")]
+        client.refresh_token_budgets()
+        assert client._rate_limiter.remaining(url, "token abc") == 49
+        assert client._rate_limiter.remaining(url, "token def") == 4000
+        client.get(url, {"Authorization": "token abc"})
+        client.get(url, {"Authorization": "token other"})
+        client.get(url)
+        assert sent[-3:] == [(url, "token def"), (url, "token other"), (url, None)]
+    finally:
+        client.set_tokens([])
+
+
+def test_client_cached_get_without_cache(monkeypatch):
+    def mock_get(*args, **kwargs):
+        return MockResponseCIPassing()
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    client.set_cache(None)
+    assert client.cached_get("https://fakeurl").json() == MockResponseCIPassing.json()
+
+
+def test_client_cached_get_revalidates_with_etag(monkeypatch, tmp_path):
+    sent_headers = []
+    responses = [
+        MockCachingResponse(200, b'{"total_count": 1}', {"ETag": '"abc"', "Link": "<next>"}),
+        MockCachingResponse(304, headers={"ETag": '"abc"'}),
+        MockCachingResponse(200, b'{"total_count": 2}', {"Last-Modified": "Tue, 01 Jul 2025 00:00:00 GMT"}),
+        MockCachingResponse(304),
+    ]
+
+    def mock_get(self, url, headers=None, **kwargs):
+        sent_headers.append(headers)
+        return responses.pop(0)
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    client.set_cache(tmp_path / "cache" / "http.sqlite")
+    try:
+        first = client.cached_get("https://fakeurl", headers={"Authorization": "token abc"})
+        second = client.cached_get("https://fakeurl", headers={"Authorization": "token abc"})
+        third = client.cached_get("https://fakeurl")
+        fourth = client.cached_get("https://fakeurl")
+    finally:
+        client.set_cache(None)
+
+    assert first.json() == {"total_count": 1}
+    assert second.status_code == 200
+    assert second.from_cache
+    assert second.json() == {"total_count": 1}
+    assert second.headers["link"] == "<next>"
+    assert third.json() == {"total_count": 2}
+    assert fourth.json() == {"total_count": 2}
+    assert sent_headers == [
+        {"Authorization": "token abc"},
+        {"Authorization": "token abc", "If-None-Match": '"abc"'},
+        {"If-None-Match": '"abc"'},
+        {"If-Modified-Since": "Tue, 01 Jul 2025 00:00:00 GMT"},
+    ]
+
+
+def test_client_cached_get_skips_responses_without_validators(monkeypatch, tmp_path):
+    def mock_get(*args, **kwargs):
+        return MockCachingResponse(200, b"[]")
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    cache = HTTPCache(tmp_path / "http.sqlite")
+    monkeypatch.setattr(client, "_cache", cache)
+    assert client.cached_get("https://fakeurl").json() == []
+    assert cache.get("https://fakeurl") is None
+    cache.close()
+    cache.close()
+
+
+GRAPHQL_REPOSITORY = {
+    "defaultBranchRef": {
+        "name": "main",
+        "target": {"oid": "abc", "authoredDate": "2021-06-12T00:00:00Z", "tree": {"oid": "def"}},
+    },
+    "stargazerCount": 5,
+    "forkCount": 6,
+    "watchers": {"totalCount": 10},
+    "openIssues": {"totalCount": 4},
+    "openPullRequests": {"totalCount": 2},
+}
+
+
+class MockResponseGraphQL:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return {"data": self.data}
+
+
+def test__get_repositories_query():
+    query = _get_repositories_query([("django", "django"), ('we"ird', "repo")])
+    assert query.startswith('query {\n  repo0: repository(owner: "django", name: "django") {')
+    assert 'repo1: repository(owner: "we\\"ird", name: "repo") {' in query
+    assert query.count("stargazerCount") == 2
+
+
+def test_get_repository_facts(monkeypatch):
+    calls = []
+
+    def mock_post(self, url, headers=None, json=None, **kwargs):
+        calls.append((url, headers, json))
+        return MockResponseGraphQL({"repo0": GRAPHQL_REPOSITORY, "repo1": None})
+
+    monkeypatch.setattr(requests.Session, "post", mock_post)
+    headers = {"Authorization": "token abc"}
+    actual = get_repository_facts([("django", "django"), ("missing", "repo")], headers)
+    assert actual == {("django", "django"): GRAPHQL_REPOSITORY}
+    assert calls[0][0] == GRAPHQL_URL
+    assert calls[0][1] == headers
+    assert "repo1: repository" in calls[0][2]["query"]
+
+
+def test__get_rest_documents():
+    repo_url = "https://api.github.com/repos/django/django"
+    actual = _get_rest_documents("django", "django", GRAPHQL_REPOSITORY)
+    assert actual == {
+        repo_url: {
+            "default_branch": "main",
+            "watchers": 5,
+            "network_count": 6,
+            "open_issues": 6,
+            "subscribers_count": 10,
+        },
+        f"{repo_url}/commits/main": {
+            "sha": "abc",
+            "commit": {"author": {"date": "2021-06-12T00:00:00Z"}, "tree": {"sha": "def"}},
+        },
+    }
+    empty_repository = {**GRAPHQL_REPOSITORY, "defaultBranchRef": None}
+    actual = _get_rest_documents("django", "django", empty_repository)
+    assert list(actual) == [repo_url]
+
+
+def test_preload_repositories_answers_rest_checks(monkeypatch):
+    posts = []
+
+    def mock_post(self, url, headers=None, json=None, **kwargs):
+        posts.append(json["query"])
+        return MockResponseGraphQL({f"repo{i}": GRAPHQL_REPOSITORY for i in range(json["query"].count("repository("))})
+
+    def mock_get(*args, **kwargs):  # pragma: no cover
+        raise AssertionError("The REST API should not be called")
+
+    monkeypatch.setattr(requests.Session, "post", mock_post)
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    assert preload_repositories([("django", "django")], {}) == []
+    assert posts == []
+
+    try:
+        repos = [("django", "django"), ("django", "django"), ("author", "package"), ("other", "package")]
+        preload_repositories(repos, {"Authorization": "token abc"}, batch_size=2)
+        assert len(posts) == 2
+        urls = _get_repo_urls("django", "django", "main")
+        assert well_used(urls["api_url"], {}) == "[green]The project has the following statistics:\n" + (
+            "- Watchers: 5\n- Forks: 6\n- Open Issues: 6\n- Subscribers: 10"
+        )
+        assert commit_in_last_year(urls["commits_url"], {}).startswith("[red]No. The last commit was")
+        assert _get_markers({"commits_url": urls["commits_url"]}, {}) == {"head": "abc", "tree": "def"}
+        # Every open bug is paged through over REST, the query doesn't cut the list short
+        with pytest.raises(AssertionError, match="REST API"):
+            bug_responding(urls["bugs_url"], {})
+    finally:
+        client.clear_preloaded()
+
+
+def test_evaluate_requirements_with_graphql(monkeypatch):
+    preloaded = []
+    evaluated = []
+
+    def mock_get(*args, **kwargs):
+        return MockResponseProjectURLs()
+
+    def mock_evaluate_report(package, headers, show_progress, workers, snapshot=None, archive=False, memo=None):
+        evaluated.append(snapshot)
+        return PackageReport(package, 0, {})
+
+    def mock_get_package_repo(snapshot):
+        if snapshot.name == "broken":
+            raise TypeError
+        return _get_package_repo(snapshot)
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    monkeypatch.setattr("the_well_maintained_test.evaluate._get_package_repo", mock_get_package_repo)
+
+    def mock_preload_repositories(repos, headers):
+        preloaded.extend(repos)
+        client.preload("https://api.github.com/repos/django/django", {"default_branch": "main"})
+        return ["https://api.github.com/repos/django/django"]
+
+    monkeypatch.setattr("the_well_maintained_test.evaluate.preload_repositories", mock_preload_repositories)
+    monkeypatch.setattr("the_well_maintained_test.evaluate.evaluate_report", mock_evaluate_report)
+    client.preload("https://api.github.com/repos/other/run", {"default_branch": "main"})
+    list(evaluate_requirements(["Django", "broken"], {}, jobs=2, graphql=True))
+    assert preloaded == [("django", "django")]
+    # Only the run's own preloads are forgotten when it is done
+    assert list(client._preloaded) == ["https://api.github.com/repos/other/run"]
+    client.clear_preloaded()
+    assert evaluated[0].name == "Django"
+    assert evaluated[1] is None
+
+
+def test_evaluate_report_with_graphql(monkeypatch):
+    preloaded = []
+
+    def mock_get(*args, **kwargs):
+        return MockResponseProjectURLs()
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+
+    def mock_preload_repositories(repos, headers):
+        preloaded.extend(repos)
+        client.preload("https://api.github.com/repos/django/django", {"default_branch": "main"})
+        return ["https://api.github.com/repos/django/django"]
+
+    monkeypatch.setattr("the_well_maintained_test.evaluate.preload_repositories", mock_preload_repositories)
+    monkeypatch.setattr("the_well_maintained_test.evaluate._get_package_urls", lambda snapshot, headers, memo=None: {})
+    monkeypatch.setattr("the_well_maintained_test.evaluate.evaluate_package", lambda *args: iter([]))
+    monkeypatch.setattr("the_well_maintained_test.evaluate.get_vulnerabilities", lambda pypi_data: 0)
+    assert evaluate_report("Django", {}, graphql=True) == PackageReport("Django", 0, {})
+    assert preloaded == [("django", "django")]
+    assert client._preloaded == {}
+
+
+def test_evaluate_report_against_fake_services(monkeypatch):
+    monkeypatch.setattr(client, "_rate_limiter", RateLimiter())
+    with FakeServices({"demo": 12}, tests_per_file=3, bugs=101) as services, services.use():
+        blobs = evaluate_report("demo", {})
+        assert blobs.error is None
+        assert blobs.answers["5"].startswith("[green]There are 36 tests in 12 files:")
+        assert blobs.answers["4"].startswith("[green]The maintainer responded to 101 of 101 open bugs")
+        assert services.requests["github-blob"] == 12
+        assert services.requests["github-issues"] == 2
+
+        services.reset_counts()
+        archive = evaluate_report("demo", {}, archive=True)
+        assert archive.answers == blobs.answers
+        assert services.requests["github-blob"] == 0
+        assert services.requests["github-tarball"] == 1
+        assert client._rate_limiter.remaining("https://api.github.com/repos/fake/demo") < 1_000_000
+
+
+def test_profile_counts_requests_per_question(monkeypatch, tmp_path):
+    monkeypatch.setattr(client, "_rate_limiter", RateLimiter())
+    client.set_cache(tmp_path / "http.sqlite")
+    profile = profiling.Profile()
+    profiling.set_profile(profile)
+    try:
+        with FakeServices({"demo": 4}, bugs=3) as services, services.use():
+            evaluate_report("demo", {})
+            stages = profile.stages()
+            assert list(stages)[:2] == ["pypi", "repository"]
+            assert stages["pypi"]["calls"] == 1
+            assert stages["pypi"]["rate_limit"] == 0
+            assert stages["4"]["calls"] == 4
+            assert stages["5"]["calls"] == 5
+            assert stages["5"]["rate_limit"] == 5
+            assert stages["5"]["bytes"] > 0
+            assert stages["1"]["calls"] == 0
+            assert profile.to_dict()["total"]["calls"] == sum(services.requests.values())
+
+            second = profiling.Profile()
+            profiling.set_profile(second)
+            evaluate_report("demo", {})
+            stages = second.stages()
+            # The tree, the bug list and the timelines come back as 304 Not Modified
+            assert stages["5"]["cache_hits"] == 1
+            assert stages["5"]["rate_limit"] == 4
+            assert stages["4"]["cache_hits"] == 4
+            assert stages["4"]["rate_limit"] == 0
+    finally:
+        profiling.set_profile(None)
+        client.set_cache(None)
+
+    second.dump(tmp_path / "profile.json")
+    assert json.loads((tmp_path / "profile.json").read_text())["stages"]["5"]["calls"] == 5
+
+
+def test_in_current_stage():
+    profile = profiling.Profile()
+    profiling.set_profile(profile)
+    try:
+        with profiling.stage("5"):
+            record = profiling.in_current_stage(profiling.record_cache_hit)
+        thread = threading.Thread(target=record)
+        thread.start()
+        thread.join()
+        profiling.record_cache_hit()
+    finally:
+        profiling.set_profile(None)
+    assert profile.stages()["5"]["cache_hits"] == 1
+    assert profile.stages()["other"]["cache_hits"] == 1
+
+
+def test_package_record():
+    answers = {"9": Answer("[green]Yes", passing=True, conclusion="success"), "3": "[red]No"}
+    record = package_record("django", "3.2.9", 1, answers)
+    assert record == {
+        "package": "django",
+        "version": "3.2.9",
+        "vulnerabilities": 1,
+        "error": None,
+        "answers": {
+            "9": {"question": "9. Is the CI passing?", "message": "Yes", "data": {"passing": True, "conclusion": "success"}},
+            "3": {"question": "3. Is there a changelog?", "message": "No", "data": {}},
+        },
+    }
+    assert package_record("broken", None, 0, None)["error"] == NO_REPOSITORY_ERROR
+    assert report_record(PackageReport("offline", 0, None, "Failed"))["error"] == "Failed"
+
+
+def test_evaluate_requirements_unordered_records_against_fake_services(monkeypatch):
+    monkeypatch.setattr(client, "_rate_limiter", RateLimiter())
+    with FakeServices({"slow": 40, "fast": 1}, tests_per_file=2) as services, services.use():
+        reports = list(evaluate_requirements(["slow", "fast"], {}, jobs=2, ordered=False))
+    assert sorted(report.name for report in reports) == ["fast", "slow"]
+    records = {report.name: json.loads(json.dumps(report_record(report))) for report in reports}
+    assert records["slow"]["version"] == "1.0.0"
+    assert records["slow"]["answers"]["5"]["data"]["test_functions"] == 80
+    assert records["fast"]["answers"]["5"]["message"].startswith("There are 2 tests in 1 files:")
+    assert records["fast"]["answers"]["12"]["data"]["release_in_last_year"] is True
+    assert records["fast"]["answers"]["4"]["data"]["open_bugs"] == 3
+
+
+def test_evaluate_requirements_shares_repository_answers(monkeypatch):
+    monkeypatch.setattr(client, "_rate_limiter", RateLimiter())
+    packages = {"core": 4, "core-extras": 1, "other": 2}
+    with FakeServices(packages, repositories={"core-extras": "core"}) as services, services.use():
+        reports = {report.name: report for report in evaluate_requirements(list(packages), {}, jobs=3)}
+        for question in GITHUB_QUESTIONS:
+            assert reports["core-extras"].answers[question] == reports["core"].answers[question]
+        assert reports["core-extras"].answers["5"].startswith("[green]There are 20 tests in 4 files:")
+        assert reports["other"].answers["5"].startswith("[green]There are 10 tests in 2 files:")
+        assert services.requests["pypi"] == 3
+        # Once for the default branch and once for question 10, for each repository
+        assert services.requests["github-repo"] == 4
+        for route in ("github-tree", "github-workflows", "github-runs", "github-commit", "github-issues"):
+            assert services.requests[route] == 2, route
+        assert services.requests["github-blob"] == 6
+
+
+def test_recording_releases_output(tmp_path):
+    console.print("before")
+    with recording():
+        console.print("first package")
+        assert console.export_text(clear=False) == "first package\n"
+        console.save_text(tmp_path / "first.txt")
+        console.print("not saved")
+    assert (tmp_path / "first.txt").read_text() == "first package\n"
+    assert not console.record
+    with recording():
+        assert console.export_text() == ""
+    with recording(False):
+        console.print("streamed")
+    with recording():
+        assert console.export_text() == ""
+
+
+@pytest.mark.parametrize("output", ["txt", "html"])
+def test_report_writer_saves_each_package_on_its_own(tmp_path, output):
+    questions = _get_questions()
+    reports = [
+        PackageReport("Django", 0, {"3": "[green]Yes", "9": "[red]No"}, version="5.0"),
+        PackageReport("rich", 2, {"3": "[green]Yes"}, version="13.0"),
+        PackageReport("offline", 0, None, "Failed to resolve 'pypi.org'"),
+    ]
+    with ReportWriter(questions, output, tmp_path, workers=3, index=True) as writer:
+        for report in reports:
+            writer.write(report)
+    django = (tmp_path / f"output_django.{output}").read_text()
+    assert "Django" in django
+    assert "rich" not in django
+    assert "vulnerabilities" in (tmp_path / f"output_rich.{output}").read_text()
+    assert "Failed to resolve" in (tmp_path / f"output_offline.{output}").read_text()
+    index = (tmp_path / f"output-index.{output}").read_text()
+    assert "1/2 passing" in index
+    assert index.index("Django") < index.index("offline") < index.index("rich")
+    if output == "html":
+        assert 'href="output_rich.html"' in index
+
+
+def test_evaluate_tree_visits_each_dependency_once(monkeypatch):
+    monkeypatch.setattr(client, "_rate_limiter", RateLimiter())
+    requires = {
+        "app": ["lib-a>=1", "lib_b", "tests-only; extra == 'test'"],
+        "lib-a": ["Lib.B (>=2)", "shared"],
+        "lib-b": ["shared; python_version < '3.11'", "app"],
+        "shared": ["missing"],
+    }
+    packages = dict.fromkeys(["app", "lib-a", "lib-b", "shared", "tests-only"], 1)
+    with FakeServices(packages, requires=requires) as services, services.use():
+        reports = list(evaluate_tree(["app"], {}, jobs=3))
+        assert sorted(report.name for report in reports) == ["app", "lib-a", "lib_b", "missing", "shared"]
+        assert services.requests["pypi"] == 4
+        assert services.requests["github-tree"] == 4
+        assert next(report for report in reports if report.name == "missing").answers is None
+
+        services.reset_counts()
+        shallow = list(evaluate_tree(["lib-a"], {}, jobs=2, max_depth=1))
+        assert sorted(report.name for report in shallow) == ["Lib.B", "lib-a", "shared"]
+
+
+def test__get_requires_dist():
+    pypi_data = {"info": {"requires_dist": ["idna (<4,>=2.5)", "PySocks>=1.5.6; extra == 'socks'", "colorama; os_name == 'nt'"]}}
+    assert _get_requires_dist(pypi_data) == ["idna", "colorama"]
+    assert _get_requires_dist({"info": {"requires_dist": None}}) == []
+
+
+def test_snapshot_bundle_replays_offline(monkeypatch, tmp_path):
+    monkeypatch.setattr(client, "_rate_limiter", RateLimiter())
+    recorder = BundleWriter(["alpha", "beta"])
+    client.set_recorder(recorder)
+    try:
+        with FakeServices({"alpha": 3, "beta": 1}) as services, services.use():
+            recorded = list(evaluate_requirements(["alpha", "beta"], {}, jobs=2))
+            archived = evaluate_report("alpha", {}, archive=True)
+    finally:
+        client.set_recorder(None)
+    assert recorded[0].answers["5"].startswith("[green]There are 15 tests in 3 files:")
+    path = recorder.save(tmp_path / "bundle.zip")
+    with zipfile.ZipFile(path) as bundle:
+        blobs = [name for name in bundle.namelist() if name.startswith("blobs/")]
+        assert json.loads(bundle.read("index.json"))["packages"] == ["alpha", "beta"]
+    # Every test file has the same source, so it is only stored once
+    assert len(blobs) < len(recorder)
+
+    # The fake services are gone, every answer has to come from the bundle
+    client.set_offline(Bundle(path))
+    try:
+        assert list(evaluate_requirements(["alpha", "beta"], {}, jobs=2)) == recorded
+        assert evaluate_report("alpha", {}, archive=True).answers == archived.answers
+        missing = evaluate_report("gamma", {})
+        assert missing.error == "https://pypi.org/pypi/gamma/json isn't in the snapshot bundle bundle.zip"
+    finally:
+        client.set_offline(None)